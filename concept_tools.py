@@ -0,0 +1,298 @@
+"""動的概念発見アプリの補助コマンド
+
+使い方:
+    python concept_tools.py bench-parsers weblio_page.html --repeat 50
+    python concept_tools.py bench-tokenizer weblio_page.html --repeat 200
+    python concept_tools.py bench-parse-pool weblio_page.html --workers 4 --pages 200
+    python concept_tools.py ingest-wikipedia jawiki-latest-pages-articles.xml.bz2
+    python concept_tools.py record fixtures.jsonl.gz 音楽 技術
+    python concept_tools.py replay fixtures.jsonl.gz 音楽 技術 --latency 0.05 --error-rate 0.1 --repeat 20
+    python concept_tools.py export concept_dictionary.jsonl.gz --gzip --since 1700000000
+    python concept_tools.py import team_dictionary.jsonl.gz --source チームA
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import concept_workers
+from newconcept import (PARSER_BACKENDS, DICTIONARY_MAX_DIVS, DEFAULT_PARSER_BACKEND, EXTRACTION_BACKENDS,
+                        DEFAULT_EXTRACTION_BACKEND, ParsePool, WIKI_INDEX_PATH, WikipediaIndex, ExtractionCache,
+                        WebConceptScraper, ingest_wikipedia_dump, ReplayHTTPAdapter, Deadline, SEARCH_SOURCES,
+                        search_concepts_parallel, CONCEPT_STORE_PATH, ConceptStore, EXPORT_FORMATS,
+                        iter_dictionary_export, IMPORT_SOURCE, IMPORT_BATCH_SIZE, import_dictionary)
+
+# 記録・再生の対象（HTTPを使うソース）
+FIXTURE_SOURCES = ["Wikipedia", "Weblio", "コトバンク"]
+
+
+def benchmark_parser_backends(content: bytes, repeat: int = 20) -> Dict[str, Dict[str, float]]:
+    """各パーサーバックエンドで辞書ページを解析し、1回あたりの処理時間を計測"""
+    results = {}
+    for name, backend in PARSER_BACKENDS.items():
+        texts = backend.extract_texts(content, DICTIONARY_MAX_DIVS)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            backend.extract_texts(content, DICTIONARY_MAX_DIVS)
+        elapsed = (time.perf_counter() - start) / repeat
+        results[name] = {"ms": elapsed * 1000, "chars": sum(len(text) for text in texts)}
+    return results
+
+
+def bench_parsers(args):
+    with open(args.html, 'rb') as f:
+        content = f.read()
+
+    results = benchmark_parser_backends(content, args.repeat)
+    baseline = results["soup"]["ms"]
+    print(f"{len(content) / 1024:.0f} KB, {args.repeat}回の平均")
+    for name, result in sorted(results.items(), key=lambda item: item[1]["ms"]):
+        print(f"{name:10s} {result['ms']:9.2f} ms  x{baseline / result['ms']:5.1f}  {result['chars']:6d} 文字")
+
+
+def _legacy_extract_concepts(text: str, max_concepts: int = 5) -> List[str]:
+    """比較用: 呼び出しごとに3つの正規表現で走査していた従来の抽出処理"""
+    if not text:
+        return []
+    text = re.sub(r'<[^>]+>', '', text)
+    patterns = [
+        r'[ァ-ヶー]{2,8}',
+        r'[一-龯]{2,6}',
+        r'[ぁ-ゖ]{2,6}',
+    ]
+    concepts = []
+    for pattern in patterns:
+        concepts.extend(re.findall(pattern, text))
+    exclude_words = {'です', 'ます', 'である', 'として', 'について', 'により', 'によって', 'から', 'まで', 'など',
+                     'こと', 'もの', 'ため', 'ところ', 'とき', 'ここ', 'そこ', 'あそこ', 'これ', 'それ', 'あれ'}
+    concepts = [c for c in concepts if c not in exclude_words and len(c) >= 2]
+    return list(set(concepts))[:max_concepts]
+
+
+def benchmark_tokenizer(texts: List[str], repeat: int = 100) -> Dict[str, float]:
+    """従来の抽出処理と各概念抽出方式で、本文1件あたりの処理時間（マイクロ秒）を計測"""
+    extractors = {"legacy": _legacy_extract_concepts}
+    for name, backend in EXTRACTION_BACKENDS.items():
+        backend.extract(texts[0], 4)  # 形態素解析器の辞書読み込みを計測から除く
+        extractors[name] = backend.extract
+
+    results = {}
+    for name, extract in extractors.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                extract(text, 4)
+        results[name] = (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+    return results
+
+
+def bench_tokenizer(args):
+    with open(args.html, 'rb') as f:
+        content = f.read()
+
+    texts = PARSER_BACKENDS[DEFAULT_PARSER_BACKEND].extract_texts(content, args.divs)
+    if not texts:
+        print("対象のdivが見つかりませんでした")
+        return
+    results = benchmark_tokenizer(texts, args.repeat)
+    print(f"本文{len(texts)}件（平均{sum(map(len, texts)) // len(texts)}文字）, {args.repeat}回の平均")
+    for name, micros in results.items():
+        print(f"{name:10s} {micros:9.1f} µs  x{results['legacy'] / micros:5.2f}")
+
+
+def benchmark_parse_pool(content: bytes, workers: int, pages: int) -> Dict[str, float]:
+    """同じ辞書ページをスレッドとプロセスプールでそれぞれ解析し、1秒あたりの処理ページ数を計測"""
+    args = (content, None, DEFAULT_PARSER_BACKEND, DEFAULT_EXTRACTION_BACKEND, DICTIONARY_MAX_DIVS, 4)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        list(executor.map(lambda _: concept_workers.parse_and_extract(*args), range(pages)))
+        results["threads"] = pages / (time.perf_counter() - start)
+
+    pool = ParsePool(workers)
+    try:
+        pool.warm_up()
+        start = time.perf_counter()
+        futures = [pool.submit(content, None, DEFAULT_PARSER_BACKEND, DEFAULT_EXTRACTION_BACKEND, 8)
+                   for _ in range(pages)]
+        for future in futures:
+            future.result()
+        results["processes"] = pages / (time.perf_counter() - start)
+    finally:
+        pool.close()
+    return results
+
+
+def bench_parse_pool(args):
+    with open(args.html, 'rb') as f:
+        content = f.read()
+
+    results = benchmark_parse_pool(content, args.workers, args.pages)
+    print(f"{len(content) / 1024:.0f} KB x {args.pages}ページ, ワーカー{args.workers}")
+    for name, pages_per_second in results.items():
+        print(f"{name:10s} {pages_per_second:8.1f} ページ/秒  x{pages_per_second / results['threads']:5.2f}")
+
+
+def ingest_wikipedia(args):
+    index = WikipediaIndex(args.index)
+    # ダンプのページは1回ずつしか現れないため抽出結果キャッシュは使わない
+    scraper = WebConceptScraper(use_cache=False, extraction_cache=ExtractionCache(max_bytes=0))
+    try:
+        result = ingest_wikipedia_dump(
+            args.dump, index, scraper, EXTRACTION_BACKENDS[args.extractor], batch_size=args.batch, limit=args.limit,
+            progress=lambda pages: print(f"\r{pages}ページ", end="", flush=True)
+        )
+    finally:
+        scraper.close()
+    print(f"\n{result['pages']}ページを{result['seconds']:.1f}秒で処理 ({result['pages_per_second']:.0f} ページ/秒), "
+          f"索引の登録数: {index.count()}")
+    index.close()
+
+
+def record_fixtures(args):
+    scraper = WebConceptScraper(use_cache=False, record_to=args.archive)
+    try:
+        for word in args.words:
+            deadline = Deadline(args.deadline)
+            concepts = search_concepts_parallel(scraper, word, args.sources, deadline)
+            print(f"{word}: " + ", ".join(f"{source} {len(values)}件（{deadline.statuses.get(source)}）"
+                                          for source, values in concepts.items()))
+    finally:
+        scraper.close()
+    print(f"{scraper.archive.recorded}件のやり取りを記録 ({os.path.getsize(args.archive) / 1024:.0f} KB)")
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+def replay_fixtures(args):
+    replay = ReplayHTTPAdapter(args.archive, latency=args.latency, jitter=args.jitter,
+                               recorded_latency=args.recorded_latency, error_rate=args.error_rate,
+                               error_status=args.error_status, seed=args.seed)
+    scraper = WebConceptScraper(use_cache=False, replay=replay)
+
+    def run(word: str):
+        deadline = Deadline(args.deadline)
+        start = time.perf_counter()
+        search_concepts_parallel(scraper, word, args.sources, deadline)
+        return time.perf_counter() - start, deadline.statuses
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(run, args.words * args.repeat))
+    finally:
+        scraper.close()
+
+    latencies = [elapsed for elapsed, _ in results]
+    statuses = {}
+    for _, search_statuses in results:
+        for status in search_statuses.values():
+            statuses[status] = statuses.get(status, 0) + 1
+    print(f"{len(results)}回の検索: p50 {_percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p95 {_percentile(latencies, 0.95) * 1000:.0f} ms, 最大 {max(latencies) * 1000:.0f} ms")
+    print("ソースの状態: " + ", ".join(f"{status} {count}" for status, count in sorted(statuses.items())))
+    print("再生: " + ", ".join(f"{name} {count}" for name, count in replay.snapshot().items()))
+
+
+def export_dictionary_file(args):
+    store = ConceptStore(args.db)
+    start = time.perf_counter()
+    size = 0
+    with open(args.output, "wb") as output:
+        for chunk in iter_dictionary_export(store, args.format, args.since, args.gzip):
+            output.write(chunk)
+            size += len(chunk)
+    store.close()
+    print(f"{args.output} に書き出し ({size / 1024:.0f} KB, {time.perf_counter() - start:.1f}秒)")
+
+
+def import_dictionary_file(args):
+    store = ConceptStore(args.db)
+    with open(args.input, "rb") as stream:
+        result = import_dictionary(
+            stream, store, fmt=args.format, name=args.input, source=args.source, batch_size=args.batch,
+            progress=lambda entries: print(f"\r{entries}語", end="", flush=True)
+        )
+    print(f"\n{result['entries']}語を{result['seconds']:.1f}秒で統合 ({result['entries_per_second']:.0f} 語/秒), "
+          f"新しい対応: {result['new_links']}件, 不正な要素: {result['skipped']}件, 登録済み単語: {store.count()}")
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="動的概念発見アプリの補助コマンド")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bench = subparsers.add_parser("bench-parsers", help="HTMLパーサーバックエンドの速度を比較")
+    bench.add_argument("html", help="保存したWeblio/コトバンクのページ")
+    bench.add_argument("--repeat", type=int, default=20)
+    bench.set_defaults(func=bench_parsers)
+
+    bench = subparsers.add_parser("bench-tokenizer", help="概念抽出方式の速度を比較")
+    bench.add_argument("html", help="保存したWeblio/コトバンクのページ")
+    bench.add_argument("--divs", type=int, default=20, help="計測に使う本文divの数")
+    bench.add_argument("--repeat", type=int, default=100)
+    bench.set_defaults(func=bench_tokenizer)
+
+    bench = subparsers.add_parser("bench-parse-pool", help="スレッドとプロセスプールでの解析スループットを比較")
+    bench.add_argument("html", help="保存したWeblio/コトバンクのページ")
+    bench.add_argument("--workers", type=int, default=4)
+    bench.add_argument("--pages", type=int, default=100)
+    bench.set_defaults(func=bench_parse_pool)
+
+    ingest = subparsers.add_parser("ingest-wikipedia", help="Wikipediaのダンプからローカルの概念索引を作成")
+    ingest.add_argument("dump", help="記事ダンプまたは抄録ダンプ（.xml / .bz2 / .gz）")
+    ingest.add_argument("--index", default=WIKI_INDEX_PATH, help="索引のSQLiteファイル")
+    ingest.add_argument("--extractor", choices=list(EXTRACTION_BACKENDS), default=DEFAULT_EXTRACTION_BACKEND)
+    ingest.add_argument("--batch", type=int, default=1000, help="1トランザクションで書き込むページ数")
+    ingest.add_argument("--limit", type=int, help="処理するページ数の上限")
+    ingest.set_defaults(func=ingest_wikipedia)
+
+    record = subparsers.add_parser("record", help="検索時のHTTPのやり取りを圧縮アーカイブに記録")
+    record.add_argument("archive", help="記録先（.jsonl.gz、既存のファイルには追記）")
+    record.add_argument("words", nargs="+")
+    record.add_argument("--sources", nargs="+", choices=SEARCH_SOURCES, default=FIXTURE_SOURCES)
+    record.add_argument("--deadline", type=float, default=30.0)
+    record.set_defaults(func=record_fixtures)
+
+    replay = subparsers.add_parser("replay", help="記録したアーカイブを再生して負荷試験を実行")
+    replay.add_argument("archive")
+    replay.add_argument("words", nargs="+")
+    replay.add_argument("--sources", nargs="+", choices=SEARCH_SOURCES, default=FIXTURE_SOURCES)
+    replay.add_argument("--deadline", type=float, default=2.5)
+    replay.add_argument("--repeat", type=int, default=10)
+    replay.add_argument("--concurrency", type=int, default=4)
+    replay.add_argument("--latency", type=float, default=0.0, help="1リクエストあたりの遅延（秒）")
+    replay.add_argument("--jitter", type=float, default=0.0, help="遅延に加える一様乱数の幅（秒）")
+    replay.add_argument("--recorded-latency", action="store_true", help="記録時の応答時間も遅延に加える")
+    replay.add_argument("--error-rate", type=float, default=0.0, help="エラーを注入する割合")
+    replay.add_argument("--error-status", type=int, help="注入するエラーのステータスコード（省略時は接続エラー）")
+    replay.add_argument("--seed", type=int, default=0)
+    replay.set_defaults(func=replay_fixtures)
+
+    export = subparsers.add_parser("export", help="概念辞書をJSONL/JSONで書き出す")
+    export.add_argument("output")
+    export.add_argument("--db", default=CONCEPT_STORE_PATH, help="概念辞書のSQLiteファイル")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="jsonl")
+    export.add_argument("--gzip", action="store_true")
+    export.add_argument("--since", type=float, help="この時刻（UNIX時間）より後に更新した単語のみ")
+    export.set_defaults(func=export_dictionary_file)
+
+    load = subparsers.add_parser("import", help="書き出した概念辞書（JSON/JSONL、gzip可）を統合")
+    load.add_argument("input")
+    load.add_argument("--db", default=CONCEPT_STORE_PATH, help="概念辞書のSQLiteファイル")
+    load.add_argument("--format", choices=list(EXPORT_FORMATS), help="省略時はファイル名から判定")
+    load.add_argument("--source", default=IMPORT_SOURCE, help="ソースを持たない概念の記録先")
+    load.add_argument("--batch", type=int, default=IMPORT_BATCH_SIZE, help="1トランザクションで書き込む単語数")
+    load.set_defaults(func=import_dictionary_file)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
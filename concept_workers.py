@@ -0,0 +1,28 @@
+"""解析プロセスプールのワーカーで実行する処理
+
+Streamlitはアプリ本体を__main__以外の名前で実行するため、ワーカーに渡す関数は
+このモジュールに置き、アプリ本体（newconcept）はワーカー側で初回に読み込む。
+"""
+from typing import List, Optional, Tuple
+
+
+def warm_up(extractors: Tuple[str, ...] = ()):
+    """ワーカー起動時にアプリ本体と抽出方式（形態素解析の辞書など）を読み込んでおく"""
+    import newconcept
+    for name in extractors:
+        backend = newconcept.EXTRACTION_BACKENDS.get(name)
+        if backend is not None:
+            backend.extract("準備", 1)
+
+
+def ping() -> bool:
+    """ワーカーの起動を待つための空の処理"""
+    return True
+
+
+def parse_and_extract(content: bytes, charset: Optional[str], parser_backend: str, extractor: str,
+                      max_divs: int, max_concepts: int) -> List[str]:
+    """辞書ページの生のバイト列を解析し、抽出した概念の一覧だけを返す"""
+    import newconcept
+    texts = newconcept.PARSER_BACKENDS[parser_backend].extract_texts(content, max_divs, charset)
+    return newconcept.EXTRACTION_BACKENDS[extractor].extract_batch(texts, max_concepts).merged
@@ -1,110 +1,2053 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.response import HTTPResponse
+from bs4 import BeautifulSoup, SoupStrainer
 import json
 import time
 import random
 import math
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterator, List, Tuple, Set, Optional, NamedTuple
 import re
-from urllib.parse import quote, urljoin
+from urllib.parse import quote, urljoin, urlparse
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import os
+import sqlite3
+import tempfile
+import zlib
+import asyncio
+import base64
+import bz2
+import codecs
+import gzip
+import hashlib
+import heapq
+import io
+import multiprocessing
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from array import array
+from collections import OrderedDict, deque
+
+import concept_workers
+
+try:
+    import aiohttp
+except ImportError:  # aiohttpが無い場合は同期セッションをスレッド経由で使用
+    aiohttp = None
+
+try:
+    from lxml import etree
+except ImportError:  # lxmlが無い場合は標準ライブラリのパーサーを使用
+    etree = None
+
+try:
+    from janome.tokenizer import Tokenizer as JanomeTokenizer
+except ImportError:  # Janomeが無い場合は正規表現による抽出のみ使用
+    JanomeTokenizer = None
+
+
+# HTTPレスポンスキャッシュの設定
+CACHE_DB_PATH = os.environ.get("NEWCONCEPT_CACHE_DB", ".newconcept_cache.sqlite3")
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# ホストごとのキャッシュ有効期間（秒）
+SOURCE_CACHE_TTLS = {
+    "ja.wikipedia.org": 24 * 60 * 60,
+    "www.weblio.jp": 7 * 24 * 60 * 60,
+    "kotobank.jp": 7 * 24 * 60 * 60,
+}
+DEFAULT_CACHE_TTL = 60 * 60
+# キャッシュ対象のステータスコード（404は「存在しない」という結果としてキャッシュする）
+CACHEABLE_STATUS_CODES = (200, 404)
+
+
+class CachedResponse(NamedTuple):
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    expires_at: float
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """条件付きリクエスト用のヘッダーを作成"""
+        headers = {}
+        for name, value in self.headers.items():
+            if name.lower() == 'etag':
+                headers['If-None-Match'] = value
+            elif name.lower() == 'last-modified':
+                headers['If-Modified-Since'] = value
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """requests.Responseとして復元"""
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = self.content
+        return response
+
+
+class ResponseCache:
+    """URL+パラメータをキーとしたSQLite永続HTTPレスポンスキャッシュ"""
+
+    def __init__(self, path: str = CACHE_DB_PATH, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttls = dict(SOURCE_CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    status_code INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+            self.conn.commit()
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
 
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """URLとクエリパラメータから正規化したキーを作成"""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def ttl_for(self, url: str) -> float:
+        return self.ttls.get(urlparse(url).hostname or '', self.default_ttl)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status_code, headers, content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        status_code, headers, content, expires_at = row
+        return CachedResponse(key, status_code, json.loads(headers), bytes(content), expires_at)
+
+    def put(self, key: str, response: requests.Response):
+        """レスポンスを保存し、容量を超えた分を古い順に削除"""
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return
+        content = response.content
+        if len(content) > self.max_bytes:
+            return
+        now = time.time()
+        headers = json.dumps(dict(response.headers), ensure_ascii=False)
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self.total_bytes -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, headers, content, len(content), now + self.ttl_for(key), now)
+            )
+            self.total_bytes += len(content)
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, key: str, response: requests.Response):
+        """304応答を受けたエントリの有効期限を延長"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT headers FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            headers = json.loads(row[0])
+            # 304で更新された検証子を反映
+            for name in ('ETag', 'Last-Modified'):
+                if name in response.headers:
+                    headers = {k: v for k, v in headers.items() if k.lower() != name.lower()}
+                    headers[name] = response.headers[name]
+            self.conn.execute(
+                "UPDATE responses SET headers = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(headers, ensure_ascii=False), now + self.ttl_for(key), now, key)
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.total_bytes = 0
+                return
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.total_bytes -= row[1]
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.total_bytes = 0
+
+
+# 辞書ページで概念を抽出する対象のdivクラス
+DICTIONARY_DIV_CLASSES = frozenset({'kiji', 'NetDicBody'})
+# 1ページあたりに読み取る対象divの数
+DICTIONARY_MAX_DIVS = 2
+# 早期終了の判定のためにパーサーへ渡す1回分のバイト数（ストリーミング受信の単位も兼ねる）
+PARSER_FEED_SIZE = 16 * 1024
+# 1レスポンスあたりに受信する本文の上限
+STREAM_MAX_BYTES = 1024 * 1024
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+
+
+def _declared_charset(headers) -> Optional[str]:
+    """Content-Typeで明示された文字コード（無ければNone）"""
+    match = re.search(r'charset=["\']?([A-Za-z0-9_-]+)', headers.get('Content-Type', ''))
+    return match.group(1) if match else None
+
+
+def _sniff_encoding(content: bytes, declared: Optional[str] = None) -> str:
+    """宣言済みの文字コード、無ければmetaタグから判定（既定はUTF-8）"""
+    if declared:
+        return declared
+    match = _META_CHARSET_RE.search(content[:4096])
+    encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = 'utf-8'
+    return encoding
+
+
+def _is_target_div(classes: Optional[str]) -> bool:
+    return bool(classes) and not DICTIONARY_DIV_CLASSES.isdisjoint(classes.split())
+
+
+class IncrementalExtraction:
+    """HTMLを少しずつ受け取り、対象divのテキストを取り出す処理の基底クラス"""
+
+    def feed(self, chunk: bytes) -> bool:
+        """HTMLの一部を渡す（必要な数のdivが揃ったらTrue）"""
+        raise NotImplementedError
+
+    def close(self) -> List[str]:
+        """取り出した対象divのテキストを返す"""
+        raise NotImplementedError
+
+
+class HTMLParserBackend:
+    """辞書ページのHTMLから対象divのテキストを取り出すパーサーバックエンド"""
+    name = ""
+
+    def start(self, max_divs: int, encoding: str) -> IncrementalExtraction:
+        raise NotImplementedError
+
+    def extract_texts(self, content: bytes, max_divs: int = DICTIONARY_MAX_DIVS,
+                      encoding: Optional[str] = None) -> List[str]:
+        """HTML全体から対象divのテキストを取り出す（揃った時点で解析を打ち切る）"""
+        extraction = self.start(max_divs, _sniff_encoding(content, encoding))
+        for offset in range(0, len(content), PARSER_FEED_SIZE):
+            if extraction.feed(content[offset:offset + PARSER_FEED_SIZE]):
+                break
+        return extraction.close()
+
+
+class _BufferedSoupExtraction(IncrementalExtraction):
+    def __init__(self, backend, max_divs: int, encoding: str):
+        self.backend = backend
+        self.max_divs = max_divs
+        self.encoding = encoding
+        self.chunks = []
+
+    def feed(self, chunk: bytes) -> bool:
+        self.chunks.append(chunk)
+        return False
+
+    def close(self) -> List[str]:
+        soup = self.backend.parse(b''.join(self.chunks), self.encoding)
+        content_divs = soup.find_all('div', class_=list(DICTIONARY_DIV_CLASSES))
+        return [div.get_text() for div in content_divs[:self.max_divs]]
+
+
+class SoupParserBackend(HTMLParserBackend):
+    """BeautifulSoupでページ全体を解析する従来の方式"""
+    name = "soup"
+
+    def start(self, max_divs: int, encoding: str) -> IncrementalExtraction:
+        return _BufferedSoupExtraction(self, max_divs, encoding)
+
+    def parse(self, content: bytes, encoding: str) -> BeautifulSoup:
+        return BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+
+
+class StrainerParserBackend(SoupParserBackend):
+    """SoupStrainerで対象divの部分木だけを構築する方式"""
+    name = "strainer"
+
+    def __init__(self):
+        # 解析時点のclass属性は空白区切りの文字列のまま渡されるため関数で判定する
+        self.strainer = SoupStrainer('div', class_=_is_target_div)
+        self.features = 'lxml' if etree is not None else 'html.parser'
+
+    def parse(self, content: bytes, encoding: str) -> BeautifulSoup:
+        return BeautifulSoup(content, self.features, parse_only=self.strainer, from_encoding=encoding)
+
+
+class _TargetDivParser(HTMLParser):
+    """対象divの中のテキストだけを集める標準ライブラリのHTMLパーサー"""
+
+    def __init__(self, max_divs: int):
+        super().__init__(convert_charrefs=True)
+        self.max_divs = max_divs
+        self.captures = []
+        self.open_captures = []
+        self.div_depth = 0
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            self.div_depth += 1
+            if len(self.captures) < self.max_divs and _is_target_div(dict(attrs).get('class')):
+                capture = (self.div_depth, [])
+                self.captures.append(capture)
+                self.open_captures.append(capture)
+        elif tag in ('script', 'style'):
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'div':
+            if self.open_captures and self.open_captures[-1][0] == self.div_depth:
+                self.open_captures.pop()
+            self.div_depth = max(self.div_depth - 1, 0)
+        elif tag in ('script', 'style'):
+            self.skip_depth = max(self.skip_depth - 1, 0)
+
+    def handle_data(self, data):
+        if self.open_captures and not self.skip_depth:
+            for _, parts in self.open_captures:
+                parts.append(data)
+
+    @property
+    def done(self) -> bool:
+        return len(self.captures) >= self.max_divs and not self.open_captures
+
+    def texts(self) -> List[str]:
+        return [''.join(parts) for _, parts in self.captures]
+
+
+class _StdlibExtraction(IncrementalExtraction):
+    def __init__(self, max_divs: int, encoding: str):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.parser = _TargetDivParser(max_divs)
+
+    def feed(self, chunk: bytes) -> bool:
+        self.parser.feed(self.decoder.decode(chunk))
+        return self.parser.done
+
+    def close(self) -> List[str]:
+        if not self.parser.done:
+            self.parser.feed(self.decoder.decode(b'', final=True))
+            self.parser.close()
+        return self.parser.texts()
+
+
+class StdlibParserBackend(HTMLParserBackend):
+    """標準ライブラリのHTMLParserによる純Pythonの逐次解析（対象divが揃ったら終了）"""
+    name = "stdlib"
+
+    def start(self, max_divs: int, encoding: str) -> IncrementalExtraction:
+        return _StdlibExtraction(max_divs, encoding)
+
+
+class _LxmlExtraction(IncrementalExtraction):
+    def __init__(self, max_divs: int, encoding: str):
+        self.parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        self.max_divs = max_divs
+        self.targets = []
+        self.closed = set()
+
+    def feed(self, chunk: bytes) -> bool:
+        self.parser.feed(chunk)
+        for event, element in self.parser.read_events():
+            if element.tag != 'div':
+                continue
+            if event == 'start':
+                if len(self.targets) < self.max_divs and _is_target_div(element.get('class')):
+                    self.targets.append(element)
+            elif any(element is target for target in self.targets):
+                self.closed.add(id(element))
+        return len(self.targets) >= self.max_divs and len(self.closed) >= len(self.targets)
+
+    def close(self) -> List[str]:
+        if len(self.closed) < len(self.targets) or len(self.targets) < self.max_divs:
+            self.parser.close()
+        return [
+            ''.join(element.xpath('.//text()[not(ancestor::script) and not(ancestor::style)]'))
+            for element in self.targets
+        ]
+
+
+class LxmlParserBackend(HTMLParserBackend):
+    """lxmlのプルパーサーによる高速な逐次解析（対象divが揃ったら終了）"""
+    name = "lxml"
+
+    def start(self, max_divs: int, encoding: str) -> IncrementalExtraction:
+        return _LxmlExtraction(max_divs, encoding)
+
+
+class DictionaryPageReader:
+    """レスポンス本文を受信しながら対象divのテキストを取り出す（十分に揃ったら受信を打ち切る）"""
+
+    def __init__(self, backend: HTMLParserBackend, max_divs: int = DICTIONARY_MAX_DIVS):
+        self.backend = backend
+        self.max_divs = max_divs
+        self.charset = None
+        self.extraction = None
+
+    def begin(self, headers):
+        """1回の受信の開始（再試行では前の試行で渡された本文を捨てて最初から解析し直す）"""
+        self.charset = _declared_charset(headers)
+        self.extraction = None
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.extraction is None:
+            self.extraction = self.backend.start(self.max_divs, _sniff_encoding(chunk, self.charset))
+        return self.extraction.feed(chunk)
+
+    def texts(self, response: requests.Response) -> List[str]:
+        """受信中に取り出したテキスト（キャッシュから返された場合は本文を解析）"""
+        if self.extraction is not None:
+            return self.extraction.close()
+        return self.backend.extract_texts(response.content, self.max_divs, _declared_charset(response.headers))
+
+
+# 利用可能なパーサーバックエンド
+PARSER_BACKENDS = {
+    backend.name: backend
+    for backend in (SoupParserBackend(), StrainerParserBackend(), StdlibParserBackend())
+}
+if etree is not None:
+    PARSER_BACKENDS[LxmlParserBackend.name] = LxmlParserBackend()
+DEFAULT_PARSER_BACKEND = LxmlParserBackend.name if etree is not None else StdlibParserBackend.name
+
+
+# 概念として扱わない語
+STOPWORDS = frozenset({
+    'です', 'ます', 'である', 'として', 'について', 'により', 'によって', 'から', 'まで', 'など',
+    'こと', 'もの', 'ため', 'ところ', 'とき', 'ここ', 'そこ', 'あそこ', 'これ', 'それ', 'あれ'
+})
+
+
+class ExtractionBatch(NamedTuple):
+    """複数テキストの抽出結果（テキストごとの上位語と、それらを統合した順位）"""
+    per_text: List[List[str]]
+    merged: List[str]
+
+    @classmethod
+    def from_per_text(cls, per_text: List[List[str]], max_merged: Optional[int] = None) -> 'ExtractionBatch':
+        """テキストごとの上位語を統合して順位付け"""
+        candidates = [concept for concepts in per_text for concept in concepts]
+        merged = rank_concepts(candidates, len(candidates) if max_merged is None else max_merged)
+        return cls(per_text, merged)
+
+
+class ConceptTokenizer:
+    """カタカナ・漢字・ひらがなの語を1回の走査で取り出す正規表現トークナイザー"""
+
+    name = "regex"
+    TAG_PATTERN = re.compile(r'<[^>]+>')
+    # 日本語の名詞っぽい単語（カタカナ、漢字、ひらがなの連続）を1つのパターンでまとめて走査
+    TOKEN_PATTERN = re.compile(r'[ァ-ヶー]{2,8}|[一-龯]{2,6}|[ぁ-ゖ]{2,6}')
+
+    def __init__(self, stopwords: frozenset = STOPWORDS):
+        self.stopwords = frozenset(stopwords)
+
+    @staticmethod
+    def script_of(token: str) -> str:
+        """語の先頭文字から文字種を判定（ひらがな < カタカナ < 漢字の符号位置順）"""
+        first = token[0]
+        if first < 'ぁ' or first > '龯':
+            return 'other'
+        if first <= 'ゖ':
+            return 'hiragana'
+        if first <= 'ー':
+            return 'katakana'
+        return 'kanji'
+
+    def words(self, text: str) -> List[str]:
+        """ストップワードを除いた語を出現順に返す（HTMLタグは除去）"""
+        if not text:
+            return []
+        if '<' in text:
+            text = self.TAG_PATTERN.sub('', text)
+        stopwords = self.stopwords
+        return [word for word in self.TOKEN_PATTERN.findall(text) if word not in stopwords]
+
+    def words_batch(self, texts: List[str]) -> List[List[str]]:
+        """複数のテキストをまとめて語に分割（パターンとストップワードの参照は1回だけ）"""
+        strip_tags = self.TAG_PATTERN.sub
+        findall = self.TOKEN_PATTERN.findall
+        stopwords = self.stopwords
+        return [
+            [word for word in findall(strip_tags('', text) if '<' in text else text) if word not in stopwords]
+            if text else []
+            for text in texts
+        ]
+
+    def extract_batch(self, texts: List[str], max_concepts: int = 5,
+                      max_merged: Optional[int] = None) -> ExtractionBatch:
+        """各テキストの上位max_concepts語と、それらをまとめて順位付けした結果を返す"""
+        per_text = [rank_concepts(words, max_concepts) for words in self.words_batch(texts)]
+        return ExtractionBatch.from_per_text(per_text, max_merged)
+
+    def tokenize(self, text: str) -> List[Tuple[str, str]]:
+        """(語, 文字種)の組を出現順に返す"""
+        script_of = self.script_of
+        return [(word, script_of(word)) for word in self.words(text)]
+
+    def extract(self, text: str, max_concepts: int = 5) -> List[str]:
+        """テキスト内で順位の高い語を最大max_concepts個返す"""
+        return rank_concepts(self.words(text), max_concepts)
+
+
+# 概念候補の順位付けの重み（頻度1回=1点に対する位置・文字種の加点）
+RANK_POSITION_WEIGHT = 1.0
+RANK_SCRIPT_WEIGHTS = {'katakana': 1.0, 'kanji': 1.0, 'hiragana': 0.2, 'other': 1.0}
+
+
+def rank_concepts(candidates: List[str], max_concepts: int) -> List[str]:
+    """候補を頻度・初出位置・文字種で採点し、上位max_concepts個を順位順に返す
+
+    同点の場合は初出位置、次に語そのもので並べるため、同じ入力からは常に同じ結果になる。
+    """
+    if max_concepts <= 0 or not candidates:
+        return []
+    counts: Dict[str, int] = {}
+    first_seen: Dict[str, int] = {}
+    for position, concept in enumerate(candidates):
+        if concept in counts:
+            counts[concept] += 1
+        else:
+            counts[concept] = 1
+            first_seen[concept] = position
+
+    total = len(candidates)
+    script_of = ConceptTokenizer.script_of
+
+    def sort_key(concept: str) -> Tuple[float, int, str]:
+        position = first_seen[concept]
+        score = (counts[concept]
+                 + RANK_POSITION_WEIGHT * (1 - position / total)
+                 + RANK_SCRIPT_WEIGHTS[script_of(concept)])
+        return -score, position, concept
+
+    return heapq.nsmallest(max_concepts, counts, key=sort_key)
+
+
+# 全ソースで共有するトークナイザー
+CONCEPT_TOKENIZER = ConceptTokenizer()
+
+# 形態素解析器のプールの大きさ（同時に解析できるスレッド数）
+MORPH_POOL_SIZE = 4
+MORPH_POOL_TIMEOUT = 10.0
+# 名詞のうち概念として扱わない細分類
+NOUN_EXCLUDED_SUBTYPES = frozenset({'非自立', '代名詞', '数', '接尾'})
+
+
+class TokenizerPool:
+    """形態素解析器のインスタンスを使い回すプール（辞書は初回の貸し出し時に読み込む）"""
+
+    def __init__(self, factory, size: int = MORPH_POOL_SIZE):
+        self.factory = factory
+        self.size = size
+        self.cond = threading.Condition()
+        self.idle = []
+        self.created = 0
+
+    def acquire(self, timeout: Optional[float] = MORPH_POOL_TIMEOUT):
+        """空いているインスタンスを借りる（上限まではその場で生成し、超えたら返却を待つ）"""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while not self.idle and self.created >= self.size:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("形態素解析器の空きを待つ時間が上限を超えました")
+                self.cond.wait(remaining)
+            if self.idle:
+                return self.idle.pop()
+            self.created += 1
+
+        try:
+            return self.factory()
+        except Exception:
+            with self.cond:
+                self.created -= 1
+                self.cond.notify()
+            raise
+
+    def release(self, tokenizer):
+        with self.cond:
+            self.idle.append(tokenizer)
+            self.cond.notify()
+
+
+class MorphologicalConceptTokenizer(ConceptTokenizer):
+    """Janomeの形態素解析で名詞だけを取り出すトークナイザー"""
+
+    name = "janome"
+
+    def __init__(self, stopwords: frozenset = STOPWORDS, pool_size: int = MORPH_POOL_SIZE):
+        super().__init__(stopwords)
+        self.pool = TokenizerPool(JanomeTokenizer, pool_size)
+
+    def _nouns(self, tokenizer, text: str) -> List[str]:
+        if not text:
+            return []
+        if '<' in text:
+            text = self.TAG_PATTERN.sub('', text)
+        stopwords = self.stopwords
+        words = []
+        for token in tokenizer.tokenize(text):
+            pos = token.part_of_speech.split(',')
+            if pos[0] != '名詞' or pos[1] in NOUN_EXCLUDED_SUBTYPES:
+                continue
+            surface = token.surface
+            if len(surface) >= 2 and surface not in stopwords:
+                words.append(surface)
+        return words
+
+    def words(self, text: str) -> List[str]:
+        return self.words_batch([text])[0]
+
+    def words_batch(self, texts: List[str]) -> List[List[str]]:
+        """1つの解析器を借りたまま複数のテキストを続けて解析"""
+        tokenizer = self.pool.acquire()
+        try:
+            return [self._nouns(tokenizer, text) for text in texts]
+        finally:
+            self.pool.release(tokenizer)
+
+
+# 選択できる概念抽出方式（Janomeはインストールされている場合のみ）
+EXTRACTION_BACKENDS = {CONCEPT_TOKENIZER.name: CONCEPT_TOKENIZER}
+if JanomeTokenizer is not None:
+    EXTRACTION_BACKENDS[MorphologicalConceptTokenizer.name] = MorphologicalConceptTokenizer()
+DEFAULT_EXTRACTION_BACKEND = CONCEPT_TOKENIZER.name
+
+# 抽出結果キャッシュの上限（概念文字列とキーの概算バイト数の合計）
+EXTRACTION_CACHE_MAX_BYTES = 8 * 1024 * 1024
+# 1エントリあたりのリスト・タプル等の概算オーバーヘッド
+EXTRACTION_CACHE_ENTRY_OVERHEAD = 200
+
+
+class ExtractionCache:
+    """本文のハッシュと抽出設定をキーに抽出結果を保持する、バイト数上限付きのLRUキャッシュ"""
+
+    def __init__(self, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content, config: str, max_concepts: int) -> Tuple[bytes, str, int]:
+        """本文（文字列またはバイト列）のハッシュと抽出方式・抽出数からキーを作る"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.blake2b(content, digest_size=16).digest(), config, max_concepts
+
+    @staticmethod
+    def _entry_size(concepts: List[str]) -> int:
+        return EXTRACTION_CACHE_ENTRY_OVERHEAD + sum(len(concept) * 3 for concept in concepts)
+
+    def get(self, key) -> Optional[List[str]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(entry)
+
+    def put(self, key, concepts: List[str]):
+        entry = tuple(concepts)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= self._entry_size(old)
+            self.entries[key] = entry
+            self.size += self._entry_size(entry)
+            while self.size > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= self._entry_size(evicted)
+
+    def purge(self):
+        """全エントリと統計を消去"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# 検索ソース名と各スクレイパーの検索メソッドの対応
+SOURCE_METHODS = {
+    "Wikipedia": "search_wikipedia",
+    "Weblio": "search_weblio",
+    "コトバンク": "search_kotobank",
+    "関連検索": "search_google_related",
+}
+SEARCH_SOURCES = list(SOURCE_METHODS)
+
+# MediaWiki APIの設定
+WIKIPEDIA_API_URL = "https://ja.wikipedia.org/w/api.php"
+WIKIPEDIA_SEARCH_LIMIT = 5
+# 1リクエストでまとめて問い合わせる単語数（導入部のextractsは1回20ページまで）
+WIKIPEDIA_BATCH_TITLES = 20
+# 1ページから概念候補に使うリンク数
+WIKIPEDIA_LINKS_PER_PAGE = 20
+# リンク・カテゴリの続き（continue）を取得する最大回数
+WIKIPEDIA_MAX_CONTINUES = 2
+# 概念として扱うページ名の最大文字数
+WIKIPEDIA_MAX_TITLE_LENGTH = 12
+WIKIPEDIA_DISAMBIGUATION_PATTERN = re.compile(r'\s*\(.*\)$')
+# APIが返すカテゴリ名の名前空間接頭辞（日本語版でも英語の正規名で返る）
+WIKIPEDIA_CATEGORY_PREFIX = "Category:"
+
+# ダンプから作るローカルの概念索引
+WIKI_INDEX_PATH = os.environ.get("NEWCONCEPT_WIKI_INDEX", ".newconcept_wiki_index.sqlite3")
+# 1ページあたりに索引へ保存する概念数
+WIKI_INDEX_CONCEPTS = 20
+# 抄録ダンプ（abstract.xml）のタイトルに付く接頭辞
+WIKI_ABSTRACT_TITLE_PREFIX = "Wikipedia: "
+
+# ウィキテキストの簡易整形用パターン
+WIKITEXT_TEMPLATE_PATTERN = re.compile(r'\{\{[^{}]*\}\}')
+WIKITEXT_TABLE_PATTERN = re.compile(r'\{\|.*?\|\}', re.S)
+WIKITEXT_REF_PATTERN = re.compile(r'<ref[^>/]*/>|<ref[^>]*>.*?</ref>', re.S)
+WIKITEXT_LINK_PATTERN = re.compile(r'\[\[([^\[\]|]+)(?:\|([^\[\]]*))?\]\]')
+WIKITEXT_CATEGORY_PATTERN = re.compile(r'\[\[(?:Category|カテゴリ):([^\[\]|]+)', re.I)
+WIKITEXT_MARKUP_PATTERN = re.compile(r"'{2,}|<[^>]+>")
+
+
+class WikipediaIndex:
+    """ダンプから作った「ページ名→概念」のSQLite索引"""
+
+    def __init__(self, path: str = WIKI_INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    title TEXT PRIMARY KEY,
+                    concepts TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.conn.commit()
+
+    @classmethod
+    def open_existing(cls, path: str = WIKI_INDEX_PATH) -> Optional['WikipediaIndex']:
+        """索引ファイルがある場合だけ開く（無ければNone）"""
+        return cls(path) if os.path.exists(path) else None
+
+    def lookup(self, title: str) -> Optional[List[str]]:
+        """ページ名の概念を返す（英字で始まる語は先頭を大文字にした名前も探す）"""
+        candidates = [title]
+        if title[:1].upper() != title[:1]:
+            candidates.append(title[:1].upper() + title[1:])
+        with self.lock:
+            for candidate in candidates:
+                row = self.conn.execute("SELECT concepts FROM pages WHERE title = ?", (candidate,)).fetchone()
+                if row is not None:
+                    return json.loads(row[0])
+        return None
+
+    def put_many(self, rows: List[Tuple[str, List[str]]]):
+        """複数ページの概念を1トランザクションで書き込む"""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (title, concepts) VALUES (?, ?)",
+                [(title, json.dumps(concepts, ensure_ascii=False)) for title, concepts in rows]
+            )
+            self.conn.commit()
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _open_dump(path: str):
+    """拡張子に応じて圧縮を展開しながら読むファイルを開く"""
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _page_from_wikitext(title: str, wikitext: str) -> Dict:
+    """ウィキテキストから導入部の本文・リンク・カテゴリを取り出す"""
+    categories = [{'title': name.strip()} for name in WIKITEXT_CATEGORY_PATTERN.findall(wikitext)]
+    intro = wikitext.split('\n==', 1)[0]
+    # 入れ子のテンプレートは内側から順に除去
+    for _ in range(5):
+        intro, removed = WIKITEXT_TEMPLATE_PATTERN.subn('', intro)
+        if not removed:
+            break
+    intro = WIKITEXT_REF_PATTERN.sub('', WIKITEXT_TABLE_PATTERN.sub('', intro))
+
+    links = []
+    for target, _ in WIKITEXT_LINK_PATTERN.findall(intro):
+        target = target.split('#', 1)[0].strip()
+        if target and ':' not in target:
+            links.append({'title': target})
+    # リンクは表示名に置き換え、ファイル等の名前空間付きリンクは除去
+    intro = WIKITEXT_LINK_PATTERN.sub(
+        lambda match: '' if ':' in match.group(1) else (match.group(2) or match.group(1)), intro
+    )
+    return {'title': title, 'extract': WIKITEXT_MARKUP_PATTERN.sub('', intro),
+            'links': links, 'categories': categories}
+
+
+def iter_wikipedia_dump(path: str) -> Iterator[Dict]:
+    """記事ダンプ（pages-articles）または抄録ダンプ（abstract）を逐次読み、標準名前空間のページを返す
+
+    処理済みの要素はその都度破棄するため、ファイルの大きさに関わらずメモリ使用量は一定。
+    """
+    with _open_dump(path) as f:
+        root = None
+        for event, elem in ElementTree.iterparse(f, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event != 'end':
+                continue
+            name = _local_name(elem.tag)
+            if name == 'page':
+                fields = {_local_name(child.tag): child for child in elem}
+                ns = fields.get('ns')
+                if (ns is None or ns.text == '0') and 'redirect' not in fields:
+                    text = elem.find('./{*}revision/{*}text')
+                    wikitext = text.text if text is not None else None
+                    yield _page_from_wikitext(fields['title'].text or '', wikitext or '')
+                root.clear()
+            elif name == 'doc':
+                title = elem.findtext('title') or ''
+                if title.startswith(WIKI_ABSTRACT_TITLE_PREFIX):
+                    title = title[len(WIKI_ABSTRACT_TITLE_PREFIX):]
+                yield {'title': title, 'extract': elem.findtext('abstract') or ''}
+                root.clear()
+
+# コネクションプールの設定（ホスト数とセッション横断の同時リクエスト数に合わせる）
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+
+class PoolStats:
+    """コネクションプールの利用状況（プールヒット・接続再利用）のカウンター"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.new_connections = 0
+        self.handshakes = 0
+
+    def record(self, name: str):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            checkouts, new_connections, handshakes = self.checkouts, self.new_connections, self.handshakes
+        return {
+            "checkouts": checkouts,
+            "pool_hits": checkouts - new_connections,
+            "handshakes": handshakes,
+            "reused_connections": max(checkouts - handshakes, 0),
+            "reuse_rate": (checkouts - handshakes) / checkouts if checkouts else 0.0,
+        }
+
+
+def _counting_pool_class(pool_cls, stats: PoolStats):
+    """取得・新規作成・TCP/TLS接続の回数を数えるurllib3コネクションプールを作成"""
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            stats.record("handshakes")
+            return super().connect()
+
+    class CountingConnectionPool(pool_cls):
+        ConnectionCls = CountingConnection
+
+        def _get_conn(self, timeout=None):
+            stats.record("checkouts")
+            return super()._get_conn(timeout)
+
+        def _new_conn(self):
+            stats.record("new_connections")
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """接続の再利用状況を計測するHTTPAdapter"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_cls, self.stats)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+# アーカイブに保存しないヘッダー（本文は展開済みで保存するため）
+ARCHIVE_SKIPPED_HEADERS = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection'})
+
+
+class HTTPArchive:
+    """HTTPのやり取りを1行1件のJSONとしてgzip圧縮で追記するアーカイブ"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.recorded = 0
+
+    @staticmethod
+    def make_key(method: str, url: str) -> str:
+        return f"{method} {url}"
+
+    def append(self, response: requests.Response):
+        """レスポンス（本文は読み込み済み）を1件追記"""
+        exchange = {
+            "method": response.request.method,
+            "url": response.request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items()
+                        if name.lower() not in ARCHIVE_SKIPPED_HEADERS},
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        try:
+            exchange["text"] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            exchange["base64"] = base64.b64encode(response.content).decode('ascii')
+        line = json.dumps(exchange, ensure_ascii=False) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = gzip.open(self.path, 'at', encoding='utf-8')
+            self.file.write(line)
+            self.file.flush()
+            self.recorded += 1
+
+    @staticmethod
+    def load(path: str) -> Dict[str, List[Dict]]:
+        """アーカイブを読み込み、メソッドとURLごとに記録順のやり取りを返す"""
+        exchanges = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                exchange = json.loads(line)
+                if "base64" in exchange:
+                    exchange["body"] = base64.b64decode(exchange.pop("base64"))
+                else:
+                    exchange["body"] = exchange.pop("text").encode('utf-8')
+                key = HTTPArchive.make_key(exchange["method"], exchange["url"])
+                exchanges.setdefault(key, []).append(exchange)
+        return exchanges
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class RecordingHTTPAdapter(PooledHTTPAdapter):
+    """実際に送信したリクエストとレスポンスをアーカイブに記録するHTTPAdapter"""
+
+    def __init__(self, archive: HTTPArchive, stats: PoolStats, **kwargs):
+        self.archive = archive
+        super().__init__(stats, **kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # 逐次読み込みのレスポンスも本文を読み切って記録する（以降の読み出しは読み込み済みの本文から）
+        response.content
+        self.archive.append(response)
+        return response
+
+
+class ReplayHTTPAdapter(HTTPAdapter):
+    """アーカイブのやり取りをネットワークに接続せずに返すHTTPAdapter（遅延とエラーを注入可能）"""
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0, recorded_latency: bool = False,
+                 error_rate: float = 0.0, error_status: Optional[int] = None, seed: Optional[int] = None):
+        super().__init__()
+        self.exchanges = HTTPArchive.load(path)
+        self.latency = latency
+        self.jitter = jitter
+        self.recorded_latency = recorded_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.positions = {}
+        self.replayed = 0
+        self.misses = 0
+        self.injected_errors = 0
+
+    def _next_exchange(self, key: str) -> Optional[Dict]:
+        """同じURLを複数回記録していれば記録順に繰り返し返す"""
+        recorded = self.exchanges.get(key)
+        if not recorded:
+            return None
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        return recorded[position % len(recorded)]
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        with self.lock:
+            exchange = self._next_exchange(HTTPArchive.make_key(request.method, request.url))
+            inject_error = self.random.random() < self.error_rate
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            if exchange is not None and self.recorded_latency:
+                delay += exchange["elapsed"]
+            if exchange is None:
+                self.misses += 1
+            elif inject_error:
+                self.injected_errors += 1
+            else:
+                self.replayed += 1
+
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"リプレイの遅延 {delay:.2f}秒 がタイムアウトを超えました", request=request)
+        time.sleep(delay)
+
+        if exchange is None:
+            raise requests.ConnectionError(f"アーカイブに記録がありません: {request.url}", request=request)
+        if inject_error and self.error_status is None:
+            raise requests.ConnectionError("リプレイで注入した接続エラー", request=request)
+
+        status = self.error_status if inject_error else exchange["status"]
+        body = b'' if inject_error else exchange["body"]
+        headers = dict(exchange["headers"])
+        headers['Content-Length'] = str(len(body))
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status,
+                           reason=exchange.get("reason"), preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {"replayed": self.replayed, "misses": self.misses, "injected_errors": self.injected_errors}
+
+
+# ホストごとのレート制限（毎秒リクエスト数, バースト, 同時実行数の上限）
+HOST_RATE_LIMITS = {
+    "ja.wikipedia.org": (10.0, 20, 8),
+    "www.weblio.jp": (3.0, 6, 4),
+    "kotobank.jp": (3.0, 6, 4),
+}
+DEFAULT_HOST_RATE_LIMIT = (5.0, 10, 4)
+MIN_HOST_RATE = 0.2
+# レート制限の空き待ちの上限（秒）
+RATE_LIMIT_QUEUE_TIMEOUT = 5.0
+# 混雑・レート制限を示すステータスコード
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class RateLimitTimeout(TimeoutError):
+    """レート制限の待ち行列で期限までに送信枠を得られなかった"""
+
+
+def _retry_after_seconds(response: Optional[requests.Response]) -> float:
+    if response is None:
+        return 0.0
+    try:
+        return max(float(response.headers.get('Retry-After', 0)), 0.0)
+    except ValueError:
+        return 0.0
+
+
+class TokenBucket:
+    """1ホスト分のトークンバケットと同時実行数の上限（429/503を受けると送信速度を下げる）"""
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.throttled = 0
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _try_take(self, deadline: float, timeout: float) -> Optional[float]:
+        """空きがあれば送信枠を確保してNone、無ければ次に確認するまでの秒数を返す（ロック取得済みで呼ぶ）"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.in_flight < self.max_in_flight and self.tokens >= 1 and now >= self.blocked_until:
+            self.tokens -= 1
+            self.in_flight += 1
+            return None
+        if now >= deadline:
+            raise RateLimitTimeout(f"送信待ちが{timeout:.1f}秒を超えました")
+        wait = max((1 - self.tokens) / self.rate, self.blocked_until - now, 0.01)
+        return min(wait, deadline - now)
+
+    def acquire(self, timeout: float):
+        """送信枠が空くまで待つ（timeout秒を超えたらRateLimitTimeout）"""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                wait = self._try_take(deadline, timeout)
+                if wait is None:
+                    return
+                self.cond.wait(wait)
+
+    async def acquire_async(self, timeout: float):
+        """acquireのコルーチン版（待機中に取り消されても送信枠は確保されたまま残らない）"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.cond:
+                wait = self._try_take(deadline, timeout)
+            if wait is None:
+                return
+            # 同時実行数の空きは通知されないため、その場合は短い間隔（0.01秒）で確認し直す
+            await asyncio.sleep(wait)
+
+    def release(self, throttled: bool = False, retry_after: float = 0.0):
+        """送信枠を返却し、結果に応じて送信速度を調整（AIMD）"""
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                self.rate = max(self.rate / 2, MIN_HOST_RATE)
+                self.tokens = min(self.tokens, 0.0)
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            self.cond.notify_all()
+
+
+class HostRateLimiter:
+    """ホスト単位のトークンバケットを管理するレート制限"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int, int]]] = None,
+                 default: Tuple[float, int, int] = DEFAULT_HOST_RATE_LIMIT):
+        self.limits = dict(HOST_RATE_LIMITS if limits is None else limits)
+        self.default = default
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname or ''
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(*self.limits.get(host, self.default))
+            return bucket
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            buckets = dict(self.buckets)
+        return {
+            host: {"rate": bucket.rate, "in_flight": bucket.in_flight, "throttled": bucket.throttled}
+            for host, bucket in buckets.items()
+        }
+
+
+# 1回の検索全体の制限時間（秒）
+SEARCH_DEADLINE = 2.5
+# ソースごとの完了状況の表示名
+SOURCE_STATUS_LABELS = {"complete": "完了", "partial": "一部のみ", "timeout": "時間切れ", "error": "エラー"}
+
+
+class DeadlineExceeded(TimeoutError):
+    """検索の制限時間を超えた"""
+
+
+# 制限時間切れとして扱う例外（requests.TimeoutはTimeoutErrorを継承しない）
+DEADLINE_ERRORS = (TimeoutError, requests.Timeout)
+
+
+class Deadline:
+    """1回の検索全体の期限と、ソースごとの完了状況"""
+
+    def __init__(self, seconds: float = SEARCH_DEADLINE):
+        self.expires_at = time.monotonic() + seconds
+        self.lock = threading.Lock()
+        self.statuses = {}
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, limit: float) -> float:
+        """残り時間で上限をかけたタイムアウト（期限切れならDeadlineExceeded）"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("検索の制限時間を超えました")
+        return min(limit, remaining)
+
+    def mark(self, source: str, status: str):
+        with self.lock:
+            self.statuses[source] = status
+
+
+# 冪等なGETの再試行設定（指数バックオフ+フルジッター）
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_BASE = 0.2
+RETRY_BACKOFF_CAP = 2.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# サーキットブレーカーの設定
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0
+
+
+def _backoff_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    """再試行までの待ち時間（Retry-Afterがあればそれ以上待つ）"""
+    delay = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt))
+    return max(delay, min(_retry_after_seconds(response), RETRY_BACKOFF_CAP))
+
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いているためソースへのリクエストを省略した"""
+
+
+class CircuitBreaker:
+    """ソース単位のサーキットブレーカー（closed → open → half_open → closed）"""
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """リクエストを送ってよいか判定（half_openでは試行を1件だけ通す）"""
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_abandoned(self):
+        """期限切れで結果が分からなかった試行（half_openなら次の呼び出しで再試行させる）"""
+        with self.lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record(self, response: requests.Response):
+        if response.status_code in RETRY_STATUS_CODES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+# ヘッジング（応答が遅いリクエストへの複製送信）の設定
+HEDGE_HOSTS = ("ja.wikipedia.org",)
+HEDGE_PERCENTILE = 0.95
+HEDGE_MAX_RATIO = 0.05
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+
+class HedgePolicy:
+    """遅いリクエストに複製を送るヘッジングの設定と統計"""
+
+    def __init__(self, hosts=HEDGE_HOSTS, percentile: float = HEDGE_PERCENTILE,
+                 max_ratio: float = HEDGE_MAX_RATIO, min_samples: int = HEDGE_MIN_SAMPLES,
+                 window: int = HEDGE_WINDOW):
+        self.hosts = set(hosts)
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.latencies = {host: deque(maxlen=window) for host in self.hosts}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def covers(self, url: str) -> bool:
+        return urlparse(url).hostname in self.hosts
+
+    def record_latency(self, url: str, seconds: float):
+        with self.lock:
+            self.latencies[urlparse(url).hostname].append(seconds)
+
+    def hedge_delay(self, url: str) -> Optional[float]:
+        """複製を送るまでの待ち時間（最近の応答時間のパーセンタイル、サンプル不足ならNone）"""
+        with self.lock:
+            self.requests += 1
+            samples = sorted(self.latencies[urlparse(url).hostname])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(int(len(samples) * self.percentile), len(samples) - 1)]
+
+    def try_acquire_hedge(self) -> bool:
+        """複製の送信数が全リクエストに対する上限比率を超えないか確認して確保"""
+        with self.lock:
+            if self.hedges + 1 > self.requests * self.max_ratio:
+                return False
+            self.hedges += 1
+            return True
+
+    def release_hedge(self):
+        """送信前に打ち切った複製を上限比率の計算から外す"""
+        with self.lock:
+            self.hedges -= 1
+
+    def record_win(self):
+        with self.lock:
+            self.hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_ratio": self.hedges / self.requests if self.requests else 0.0,
+            }
+
+
+def _close_response(future):
+    """採用されなかったヘッジのレスポンスを閉じて接続をプールに返す"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class _FlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """同じキーに対する同時実行中の取得を1回にまとめ、結果を全呼び出し元で共有する"""
 
-class WebConceptScraper:
     def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.coalesced = 0
+
+    def _join(self, key) -> Tuple[_FlightCall, bool]:
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self.calls[key] = _FlightCall()
+            return call, True
+
+    def _finish(self, key, call: _FlightCall, result=None, error: Optional[BaseException] = None):
+        call.result, call.error = result, error
+        with self.lock:
+            del self.calls[key]
+        call.done.set()
+
+    @staticmethod
+    def _outcome(call: _FlightCall):
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, *args, timeout: Optional[float] = None):
+        """keyの取得が実行中ならその完了を（最大timeout秒）待ち、無ければfnを実行"""
+        call, leader = self._join(key)
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError("実行中の取得を待つ間に制限時間を超えました")
+            return self._outcome(call)
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+    async def do_async(self, key, fn, *args, timeout: Optional[float] = None):
+        """doのコルーチン版（別スレッド・別イベントループの呼び出しとも集約する）"""
+        call, leader = self._join(key)
+        if not leader:
+            if not await asyncio.to_thread(call.done.wait, timeout):
+                raise TimeoutError("実行中の取得を待つ間に制限時間を超えました")
+            return self._outcome(call)
+        try:
+            result = await fn(*args)
+        except asyncio.CancelledError:
+            # 取り消しは呼び出し元のタスクだけのものなので、待っている他の呼び出しには時間切れとして渡す
+            self._finish(key, call, error=DeadlineExceeded("集約先の取得が取り消されました"))
+            raise
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+
+# 辞書ページの解析・概念抽出を行うワーカープロセス数（0でプロセスプールを使わない）
+PARSE_WORKERS = int(os.environ.get("NEWCONCEPT_PARSE_WORKERS", "0"))
+# ワーカーの起動方式（forkは通信スレッドやロックを持つ本体を複製して固まりうるため使わない）
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class ParsePool:
+    """辞書ページの解析と概念抽出をワーカープロセスで行い、GILを握るCPU処理を並列化するプール"""
+
+    def __init__(self, workers: int, extractors: Tuple[str, ...] = ()):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context(PARSE_START_METHOD),
+                                            initializer=concept_workers.warm_up, initargs=(extractors,))
+        self.submitted = 0
+
+    def warm_up(self, timeout: Optional[float] = None):
+        """全ワーカーを起動し、アプリ本体と抽出方式の読み込みを済ませておく"""
+        wait([self.executor.submit(concept_workers.ping) for _ in range(self.workers)], timeout=timeout)
+
+    def submit(self, content: bytes, charset: Optional[str], parser_backend: str, extractor: str,
+               max_concepts: int) -> Future:
+        """生のバイト列をワーカーに渡し、概念の一覧を返すFutureを得る"""
+        self.submitted += 1
+        return self.executor.submit(concept_workers.parse_and_extract, content, charset, parser_backend,
+                                    extractor, DICTIONARY_MAX_DIVS, max_concepts)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WebConceptScraper:
+    def __init__(self, cache: Optional[ResponseCache] = None, use_cache: bool = True,
+                 pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                 hedging: Optional[HedgePolicy] = None, parser_backend: str = DEFAULT_PARSER_BACKEND,
+                 parse_workers: int = 0, extraction_cache: Optional[ExtractionCache] = None,
+                 wiki_index: Optional[WikipediaIndex] = None, record_to: Optional[str] = None,
+                 replay: Optional[ReplayHTTPAdapter] = None):
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Connection': 'keep-alive'
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
 
-    def search_wikipedia(self, word: str, max_concepts: int = 10) -> List[str]:
-        """Wikipedia検索から関連概念を取得"""
-        concepts = []
+        # 同じホストへの接続を使い回すためのコネクションプール
+        # （記録時は送受信をアーカイブに保存し、再生時はネットワークの代わりにアーカイブから返す）
+        self.pool_stats = PoolStats()
+        self.archive = HTTPArchive(record_to) if record_to is not None else None
+        if replay is not None:
+            adapter = replay
+        elif self.archive is not None:
+            adapter = RecordingHTTPAdapter(self.archive, self.pool_stats, pool_connections=pool_connections,
+                                           pool_maxsize=pool_maxsize)
+        else:
+            adapter = PooledHTTPAdapter(self.pool_stats, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.fixture_adapter = adapter if replay is not None or self.archive is not None else None
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if cache is None and use_cache:
+            cache = ResponseCache()
+        self.cache = cache
+
+        # 同じ単語・ソースの同時検索をまとめる
+        self.flight = SingleFlight()
+
+        # ホストごとの送信レートと同時実行数の制限
+        self.rate_limiter = HostRateLimiter()
+
+        # 停止中のソースへのリクエストを省略するサーキットブレーカー
+        self.breakers = {source: CircuitBreaker() for source in SOURCE_METHODS}
+
+        # 辞書ページのHTML解析方式
+        self.parser_backend = PARSER_BACKENDS[parser_backend]
+
+        # 概念抽出方式（形態素解析器のプールをセッション間で共有するためスクレイパーが保持）
+        self.extractors = dict(EXTRACTION_BACKENDS)
+
+        # 同じ本文の抽出結果を使い回すキャッシュ（スクレイパーと共にプロセス全体で共有）
+        self.extraction_cache = extraction_cache if extraction_cache is not None else ExtractionCache()
+
+        # ダンプから作ったローカルの概念索引（あればWikipedia APIより先に引く）
+        self.wiki_index = wiki_index
+
+        # 辞書ページの解析と概念抽出を別プロセスで行うプール（任意）
+        self.parse_pool = None
+        if parse_workers > 0:
+            self.parse_pool = ParsePool(parse_workers, tuple(self.extractors))
+            self.parse_pool.warm_up()
+
+        # 応答の遅いホストへのヘッジング（任意）
+        self.hedging = hedging
+        self.hedge_executor = ThreadPoolExecutor(max_workers=pool_maxsize) if hedging is not None else None
+
+        # 共有インスタンスとして利用中の検索の数（退役後は最後の利用者が閉じる）
+        self.usage_lock = threading.Lock()
+        self.users = 0
+        self.retired = False
+
+    def try_enter(self) -> bool:
+        """利用中として数える（退役済みならFalse）"""
+        with self.usage_lock:
+            if self.retired:
+                return False
+            self.users += 1
+            return True
+
+    def leave(self):
+        """利用を終える（退役済みで利用中の検索が無くなれば閉じる）"""
+        with self.usage_lock:
+            self.users -= 1
+            close = self.retired and self.users == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """共有をやめる（利用中の検索が無ければすぐ、あれば最後の検索が終わったときに閉じる）"""
+        with self.usage_lock:
+            self.retired = True
+            close = self.users == 0
+        if close:
+            self.close()
+
+    def close(self):
+        """セッションとコネクションプールを閉じる"""
+        if self.hedge_executor is not None:
+            self.hedge_executor.shutdown(wait=False)
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+        if self.wiki_index is not None:
+            self.wiki_index.close()
+        if self.archive is not None:
+            self.archive.close()
+        self.session.close()
+
+    def _cache_lookup(self, url: str, params: Optional[Dict] = None) -> Tuple[str, Optional[CachedResponse]]:
+        """キャッシュキーとキャッシュ済みレスポンスを取得"""
+        key = ResponseCache.make_key(url, params)
+        cached = self.cache.get(key) if self.cache is not None else None
+        return key, cached
+
+    def _cache_store(self, key: str, cached: Optional[CachedResponse],
+                     response: requests.Response) -> requests.Response:
+        """取得したレスポンスをキャッシュに反映（304ならキャッシュ済みの内容を返す）"""
+        if self.cache is None:
+            return response
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(key, response)
+            return cached.to_response()
+        # 制限時間で受信を打ち切った本文は保存しない
+        if not getattr(response, 'incomplete', False):
+            self.cache.put(key, response)
+        return response
+
+    def _check_circuit(self, source: Optional[str], cached: Optional[CachedResponse]) -> Optional[requests.Response]:
+        """ソースのブレーカーが開いていれば期限切れのキャッシュを返すか、CircuitOpenErrorを送出"""
+        breaker = self.breakers.get(source)
+        if breaker is None or breaker.allow():
+            return None
+        if cached is not None:
+            return cached.to_response()
+        raise CircuitOpenError(f"{source}は連続エラーのため一時停止中です")
+
+    @staticmethod
+    def _record_failure(breaker: Optional[CircuitBreaker], deadline: Optional[Deadline], error: Exception):
+        """失敗をブレーカーに記録（検索の制限時間切れと、自分側の送信待ちの時間切れはソースの障害として数えない）"""
+        if breaker is None:
+            return
+        if isinstance(error, RateLimitTimeout) or (deadline is not None and deadline.expired()):
+            breaker.record_abandoned()
+        else:
+            breaker.record_failure()
+
+    def _get(self, url: str, params: Optional[Dict] = None, timeout: float = 5,
+             source: Optional[str] = None, deadline: Optional[Deadline] = None,
+             reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """キャッシュを経由してGETリクエストを送信（期限切れはETag/Last-Modifiedで再検証）"""
+        key, cached = self._cache_lookup(url, params)
+        if cached is not None and cached.is_fresh():
+            return cached.to_response()
+        fallback = self._check_circuit(source, cached)
+        if fallback is not None:
+            return fallback
+
+        headers = cached.validators() if cached is not None else {}
+        breaker = self.breakers.get(source)
         try:
-            # Wikipedia検索API
-            search_url = f"https://ja.wikipedia.org/api/rest_v1/page/summary/{quote(word)}"
-            response = self.session.get(search_url, timeout=5)
-
-            if response.status_code == 200:
-                data = response.json()
-                extract = data.get('extract', '')
-
-                # テキストから名詞を抽出（簡易版）
-                concepts.extend(self._extract_concepts_from_text(extract, max_concepts // 2))
-
-            # Wikipedia検索結果から関連ページを取得
-            search_api_url = f"https://ja.wikipedia.org/w/api.php"
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'list': 'search',
-                'srsearch': word,
-                'srlimit': 5
-            }
+            response = self._fetch(key, headers, timeout, deadline, reader)
+        except Exception as e:
+            self._record_failure(breaker, deadline, e)
+            raise
+        if breaker is not None:
+            breaker.record(response)
+        return self._cache_store(key, cached, response)
+
+    def _fetch(self, url: str, headers: Dict[str, str], timeout: float,
+               deadline: Optional[Deadline] = None,
+               reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """冪等なGETを指数バックオフ（ジッター付き）で再試行（制限時間内に限る）"""
+        for attempt in range(RETRY_ATTEMPTS):
+            last_attempt = attempt == RETRY_ATTEMPTS - 1
+            response = None
+            try:
+                response = self._hedged_send(url, headers, timeout, deadline, reader)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt or (deadline is not None and deadline.expired()):
+                    raise
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUS_CODES:
+                    return response
+            delay = _backoff_delay(attempt, response)
+            if deadline is not None and delay >= deadline.remaining():
+                # 制限時間内に再試行できないので最後の結果で打ち切る
+                if response is not None:
+                    return response
+                raise DeadlineExceeded("検索の制限時間内に再試行できません")
+            time.sleep(delay)
+
+    def _hedged_send(self, url: str, headers: Dict[str, str], timeout: float,
+                     deadline: Optional[Deadline] = None,
+                     reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """応答がパーセンタイルを超えて遅ければ複製を送り、先に返った方を採用"""
+        # 受信しながら解析する場合は本文を1つのreaderに渡すため複製しない
+        if self.hedging is None or not self.hedging.covers(url) or reader is not None:
+            return self._send(url, headers, timeout, deadline, reader)
+
+        delay = self.hedging.hedge_delay(url)
+        primary = self.hedge_executor.submit(self._timed_send, url, headers, timeout, deadline)
+        if delay is None or wait([primary], timeout=delay).done or not self.hedging.try_acquire_hedge():
+            return primary.result()
+
+        hedge = self.hedge_executor.submit(self._timed_send, url, headers, timeout, deadline)
+        futures = [primary, hedge]
+        for future in as_completed(futures):
+            if future.exception() is None:
+                if future is hedge:
+                    self.hedging.record_win()
+                for other in futures:
+                    if other is not future:
+                        other.add_done_callback(_close_response)
+                return future.result()
+        return primary.result()
+
+    def _timed_send(self, url: str, headers: Dict[str, str], timeout: float,
+                    deadline: Optional[Deadline] = None) -> requests.Response:
+        started = time.monotonic()
+        response = self._send(url, headers, timeout, deadline)
+        self.hedging.record_latency(url, time.monotonic() - started)
+        return response
+
+    def _send(self, url: str, headers: Dict[str, str], timeout: float,
+              deadline: Optional[Deadline] = None,
+              reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """ホストのレート制限に従ってリクエストを送信"""
+        bucket = self.rate_limiter.bucket_for(url)
+        queue_timeout = RATE_LIMIT_QUEUE_TIMEOUT if deadline is None else deadline.timeout(RATE_LIMIT_QUEUE_TIMEOUT)
+        bucket.acquire(queue_timeout)
+        capped = False
+        if deadline is not None:
+            try:
+                limited = deadline.timeout(timeout)
+            except DeadlineExceeded:
+                bucket.release()
+                raise
+            capped, timeout = limited < timeout, limited
+        response = None
+        throttled = False
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, stream=reader is not None)
+            if reader is not None:
+                self._read_streamed(response, reader, deadline)
+            throttled = response.status_code in THROTTLE_STATUS_CODES
+            return response
+        except requests.Timeout:
+            # 応答の遅延も混雑のシグナルとして扱う（検索の残り時間で短くしたタイムアウトは除く）
+            throttled = not capped
+            raise
+        except requests.ConnectionError as e:
+            # 本文の受信中の読み込みタイムアウトはConnectionErrorになるため、検索の制限時間によるものは時間切れにする
+            read_timeout = bool(e.args) and isinstance(e.args[0], ReadTimeoutError)
+            if deadline is not None and (deadline.expired() or (capped and read_timeout)):
+                raise DeadlineExceeded("応答の受信中に検索の制限時間を超えました") from e
+            raise
+        finally:
+            bucket.release(throttled, _retry_after_seconds(response))
 
-            response = self.session.get(search_api_url, params=params, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                search_results = data.get('query', {}).get('search', [])
+    @staticmethod
+    def _read_streamed(response: requests.Response, reader: DictionaryPageReader,
+                       deadline: Optional[Deadline] = None):
+        """本文を少しずつreaderに渡し、十分に揃うか上限に達したら接続を閉じて受信を打ち切る"""
+        reader.begin(response.headers)
+        if response.status_code != 200:
+            # 本文を読み切って接続をプールに返す
+            response.content
+            return
+
+        chunks = []
+        size = 0
+        finished = True
+        try:
+            for chunk in response.iter_content(PARSER_FEED_SIZE):
+                chunk = chunk[:STREAM_MAX_BYTES - size]
+                chunks.append(chunk)
+                size += len(chunk)
+                if reader.feed(chunk) or size >= STREAM_MAX_BYTES:
+                    finished = False
+                    break
+                if deadline is not None and deadline.expired():
+                    finished = False
+                    response.incomplete = True
+                    break
+        except requests.ConnectionError:
+            # 検索の制限時間で受信が止まった場合も、受信済みの本文は一部として使う
+            if not chunks or deadline is None or not deadline.expired():
+                raise
+            finished = False
+            response.incomplete = True
+        if not finished:
+            response.close()
+        response._content = b''.join(chunks)
+        response._content_consumed = True
 
-                for result in search_results[:3]:
-                    title = result.get('title', '')
-                    snippet = result.get('snippet', '')
-                    concepts.extend(self._extract_concepts_from_text(f"{title} {snippet}", 3))
+    @staticmethod
+    def _wikipedia_page_params() -> Dict:
+        """ページの導入文・リンク・カテゴリを1回で取得するMediaWiki APIのパラメータ"""
+        return {
+            'action': 'query',
+            'format': 'json',
+            'formatversion': 2,
+            'prop': 'extracts|links|categories',
+            'exintro': 1,
+            'explaintext': 1,
+            'exlimit': 'max',
+            'pllimit': 'max',
+            'plnamespace': 0,
+            'cllimit': 'max',
+            'clshow': '!hidden',
+            'redirects': 1,
+        }
 
-        except Exception as e:
-            st.warning(f"Wikipedia検索エラー: {str(e)}")
+    def _wikipedia_search_params(self, word: str) -> Tuple[str, Dict]:
+        """検索結果の上位ページをgenerator=searchでまとめて取得"""
+        params = self._wikipedia_page_params()
+        params.update({'generator': 'search', 'gsrsearch': word, 'gsrlimit': WIKIPEDIA_SEARCH_LIMIT})
+        return WIKIPEDIA_API_URL, params
 
-        return list(set(concepts))[:max_concepts]
+    def _wikipedia_titles_params(self, words: List[str]) -> Tuple[str, Dict]:
+        """複数の単語のページをtitlesでまとめて取得"""
+        params = self._wikipedia_page_params()
+        params['titles'] = '|'.join(words)
+        return WIKIPEDIA_API_URL, params
 
-    def search_weblio(self, word: str, max_concepts: int = 8) -> List[str]:
-        """Weblio辞書から関連概念を取得"""
+    @staticmethod
+    def _merge_wikipedia_query(pages: Dict, aliases: Dict[str, str], data: Dict) -> Optional[Dict]:
+        """APIの応答をページごとに統合し、リンク・カテゴリの続きがあれば次のパラメータを返す"""
+        query = data.get('query', {})
+        for alias in query.get('normalized', []) + query.get('redirects', []):
+            aliases[alias['from']] = alias['to']
+        for page in query.get('pages', []):
+            merged = pages.setdefault(page.get('pageid', page.get('title')), {})
+            for field, value in page.items():
+                if isinstance(value, list):
+                    merged.setdefault(field, []).extend(value)
+                else:
+                    merged.setdefault(field, value)
+
+        # 検索結果の次ページ（gsroffset）だけが残っている場合は続けない
+        continuation = data.get('continue', {})
+        if any(key != 'continue' and key.endswith('continue') for key in continuation):
+            return continuation
+        return None
+
+    @staticmethod
+    def _raise_if_incomplete(response: requests.Response):
+        """制限時間で本文の受信を打ち切った応答なら、抽出できた概念を一部のみとして扱わせる"""
+        if getattr(response, 'incomplete', False):
+            raise DeadlineExceeded("本文の受信中に検索の制限時間を超えました")
+
+    @staticmethod
+    def _raise_for_failed_status(response: requests.Response):
+        """再試行しても成功しなかった応答（200・404以外）を例外にして、ソースをエラー扱いにする"""
+        if response.status_code not in (200, 404):
+            raise requests.HTTPError(f"HTTP {response.status_code}: {response.url}", response=response)
+
+    def _wikipedia_query(self, params: Dict, deadline: Optional[Deadline] = None) -> Tuple[List[Dict], Dict[str, str]]:
+        """MediaWiki APIに問い合わせ、続きを含めてページと表記ゆれ・リダイレクトの対応を返す"""
+        pages = {}
+        aliases = {}
+        params = dict(params)
+        for _ in range(WIKIPEDIA_MAX_CONTINUES + 1):
+            response = self._get(WIKIPEDIA_API_URL, params=params, timeout=5, source="Wikipedia", deadline=deadline)
+            self._raise_for_failed_status(response)
+            if response.status_code != 200:
+                break
+            continuation = self._merge_wikipedia_query(pages, aliases, response.json())
+            if continuation is None:
+                break
+            params.update(continuation)
+        return list(pages.values()), aliases
+
+    @staticmethod
+    def _weblio_url(word: str) -> str:
+        return f"https://www.weblio.jp/content/{quote(word)}"
+
+    @staticmethod
+    def _kotobank_url(word: str) -> str:
+        return f"https://kotobank.jp/search?q={quote(word)}"
+
+    @staticmethod
+    def _wikipedia_title_concept(title: str, word: str, category: bool = False) -> Optional[str]:
+        """ページ名・カテゴリ名を概念として使える形に整える（カテゴリの名前空間と曖昧さ回避の括弧を除去）"""
+        if category and title.startswith(WIKIPEDIA_CATEGORY_PREFIX):
+            # 「Re:ゼロから始める異世界生活」のようにコロンを含むページ名は、そのまま残す
+            title = title[len(WIKIPEDIA_CATEGORY_PREFIX):]
+        title = WIKIPEDIA_DISAMBIGUATION_PATTERN.sub('', title)
+        if title == word or not 2 <= len(title) <= WIKIPEDIA_MAX_TITLE_LENGTH:
+            return None
+        return title
+
+    def _concepts_from_wikipedia_pages(self, pages: List[Dict], word: str, max_concepts: int,
+                                       extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """ページの導入文から抽出した語と、ページ名・カテゴリ・リンク先を合わせて順位付け"""
+        pages = sorted((page for page in pages if not page.get('missing')), key=lambda page: page.get('index', 0))
+        batch = self.extract_concepts_batch([page.get('extract', '') for page in pages], max_concepts // 2, extractor)
+
+        candidates = []
+        for page, extracted in zip(pages, batch.per_text):
+            titles = [(page.get('title', ''), False)]
+            titles.extend((category['title'], True) for category in page.get('categories', []))
+            titles.extend((link['title'], False) for link in page.get('links', [])[:WIKIPEDIA_LINKS_PER_PAGE])
+            candidates.extend(concept for concept in extracted if concept != word)
+            candidates.extend(filter(None, (self._wikipedia_title_concept(title, word, category)
+                                            for title, category in titles)))
+        return rank_concepts(candidates, max_concepts)
+
+    @staticmethod
+    def _wikipedia_pages_by_word(words: List[str], pages: List[Dict], aliases: Dict[str, str]) -> Dict[str, Dict]:
+        """問い合わせた単語ごとに、表記の正規化とリダイレクトをたどった先のページを対応付ける"""
+        by_title = {page['title']: page for page in pages if not page.get('missing')}
+        matched = {}
+        for word in words:
+            title = aliases.get(word, word)
+            title = aliases.get(title, title)
+            if title in by_title:
+                matched[word] = by_title[title]
+        return matched
+
+    def _dictionary_reader(self) -> Optional[DictionaryPageReader]:
+        """辞書ページの逐次解析用reader（プロセスプールで解析する場合は本文をそのまま受信するためNone）"""
+        if self.parse_pool is not None:
+            return None
+        return DictionaryPageReader(self.parser_backend)
+
+    def _submit_dictionary_page(self, response: requests.Response, max_concepts: int,
+                                extractor: Optional[ConceptTokenizer] = None) -> Future:
+        """辞書ページの解析と概念抽出をプロセスプールに渡す"""
+        extractor = extractor if extractor is not None else CONCEPT_TOKENIZER
+        return self.parse_pool.submit(response.content, _declared_charset(response.headers),
+                                      self.parser_backend.name, extractor.name, max_concepts // 2)
+
+    def _page_memo(self, response: requests.Response, max_concepts: int,
+                   extractor: Optional[ConceptTokenizer] = None) -> Tuple[Tuple, Optional[List[str]]]:
+        """辞書ページ本文のハッシュで抽出結果を引く（再検証で本文が変わらなければ解析を省ける）"""
+        extractor = extractor if extractor is not None else CONCEPT_TOKENIZER
+        key = ExtractionCache.make_key(response.content, f"{self.parser_backend.name}/{extractor.name}",
+                                       max_concepts // 2)
+        return key, self.extraction_cache.get(key)
+
+    def _concepts_from_dictionary_page(self, response: requests.Response, max_concepts: int,
+                                       reader: Optional[DictionaryPageReader] = None,
+                                       extractor: Optional[ConceptTokenizer] = None,
+                                       deadline: Optional[Deadline] = None) -> List[str]:
+        """辞書サイトのHTMLから概念を抽出（項目が無ければ空、それ以外の失敗は例外）"""
+        self._raise_for_failed_status(response)
+        if response.status_code != 200:
+            return []
+        key, concepts = self._page_memo(response, max_concepts, extractor)
+        if concepts is not None:
+            return concepts
+
+        if reader is None and self.parse_pool is not None:
+            future = self._submit_dictionary_page(response, max_concepts, extractor)
+            concepts = future.result(timeout=deadline.remaining() if deadline is not None else None)
+        else:
+            reader = reader if reader is not None else DictionaryPageReader(self.parser_backend)
+            texts = reader.texts(response)
+
+            # 意味や説明文から概念を抽出（全ての本文を1回の呼び出しで処理）
+            concepts = self.extract_concepts_batch(texts, max_concepts // 2, extractor).merged
+        self.extraction_cache.put(key, concepts)
+        return concepts
+
+    @staticmethod
+    def _record_status(source: str, label: str, concepts: List[str], error: Optional[Exception],
+                       deadline: Optional[Deadline]):
+        """ソースの完了状況を記録（制限時間切れ以外のエラーは警告を表示）"""
+        if error is None:
+            status = "complete"
+        elif isinstance(error, DEADLINE_ERRORS) and deadline is not None:
+            status = "partial" if concepts else "timeout"
+        else:
+            status = "partial" if concepts else "error"
+            st.warning(f"{label}: {str(error)}")
+        if deadline is not None:
+            deadline.mark(source, status)
+
+    def _wikipedia_from_index(self, word: str, max_concepts: int,
+                              deadline: Optional[Deadline] = None) -> Optional[List[str]]:
+        """ローカル索引に単語のページがあれば、その概念を返す（索引を読めない場合はNoneでAPIに任せる）"""
+        if self.wiki_index is None:
+            return None
+        try:
+            concepts = self.wiki_index.lookup(word)
+        except (sqlite3.Error, ValueError):
+            # ロック中・破損した索引や壊れた行は、索引に無い語と同じく生のAPIで調べ直す
+            return None
+        if concepts is not None and deadline is not None:
+            deadline.mark("Wikipedia", "complete")
+        return None if concepts is None else concepts[:max_concepts]
+
+    def search_wikipedia(self, word: str, max_concepts: int = 10, deadline: Optional[Deadline] = None,
+                         extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """Wikipedia検索から関連概念を取得（検索上位ページの導入文・リンク・カテゴリを1回で取得）"""
         concepts = []
+        error = None
         try:
-            url = f"https://www.weblio.jp/content/{quote(word)}"
-            response = self.session.get(url, timeout=5)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+            indexed = self._wikipedia_from_index(word, max_concepts, deadline)
+            if indexed is not None:
+                return indexed
+            _, params = self._wikipedia_search_params(word)
+            pages, _ = self._wikipedia_query(params, deadline)
+            concepts.extend(self._concepts_from_wikipedia_pages(pages, word, max_concepts, extractor))
 
-                # 意味や説明文から概念を抽出
-                content_divs = soup.find_all('div', class_=['kiji', 'NetDicBody'])
-                for div in content_divs[:2]:
-                    text = div.get_text()
-                    concepts.extend(self._extract_concepts_from_text(text, max_concepts // 2))
+        except Exception as e:
+            error = e
+        self._record_status("Wikipedia", "Wikipedia検索エラー", concepts, error, deadline)
+
+        return concepts
+
+    def search_wikipedia_batch(self, words: List[str], max_concepts: int = 10, deadline: Optional[Deadline] = None,
+                               extractor: Optional[ConceptTokenizer] = None) -> Dict[str, List[str]]:
+        """複数の単語のWikipediaページをまとめて取得し、単語ごとの関連概念を返す（索引にある単語は問い合わせない）"""
+        concepts = {}
+        for word in dict.fromkeys(words):
+            indexed = self._wikipedia_from_index(word, max_concepts)
+            concepts[word] = indexed if indexed is not None else []
+        words = [word for word, related in concepts.items() if not related]
+        for start in range(0, len(words), WIKIPEDIA_BATCH_TITLES):
+            if deadline is not None and deadline.expired():
+                break
+            chunk = words[start:start + WIKIPEDIA_BATCH_TITLES]
+            _, params = self._wikipedia_titles_params(chunk)
+            pages, aliases = self._wikipedia_query(params, deadline)
+            for word, page in self._wikipedia_pages_by_word(chunk, pages, aliases).items():
+                concepts[word] = self._concepts_from_wikipedia_pages([page], word, max_concepts, extractor)
+        return concepts
+
+    def search_weblio(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                      extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """Weblio辞書から関連概念を取得"""
+        concepts = []
+        error = None
+        try:
+            reader = self._dictionary_reader()
+            response = self._get(self._weblio_url(word), timeout=5, source="Weblio", deadline=deadline, reader=reader)
+            concepts.extend(self._concepts_from_dictionary_page(response, max_concepts, reader, extractor, deadline))
+            self._raise_if_incomplete(response)
 
         except Exception as e:
-            st.warning(f"Weblio検索エラー: {str(e)}")
+            error = e
+        self._record_status("Weblio", "Weblio検索エラー", concepts, error, deadline)
 
-        return list(set(concepts))[:max_concepts]
+        return rank_concepts(concepts, max_concepts)
 
 
-    def search_kotobank(self, word: str, max_concepts: int = 8) -> List[str]:
+    def search_kotobank(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                        extractor: Optional[ConceptTokenizer] = None) -> List[str]:
         """コトバンクから関連概念を取得"""
         concepts = []
+        error = None
         try:
-            url = f"https://kotobank.jp/search?q={quote(word)}"
-            response = self.session.get(url, timeout=5)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # 意味や説明文から概念を抽出
-                content_divs = soup.find_all('div', class_=['kiji', 'NetDicBody'])
-                for div in content_divs[:2]:
-                    text = div.get_text()
-                    concepts.extend(self._extract_concepts_from_text(text, max_concepts // 2))
+            reader = self._dictionary_reader()
+            response = self._get(self._kotobank_url(word), timeout=5, source="コトバンク", deadline=deadline,
+                                 reader=reader)
+            concepts.extend(self._concepts_from_dictionary_page(response, max_concepts, reader, extractor, deadline))
+            self._raise_if_incomplete(response)
 
         except Exception as e:
-            st.warning(f"コトバンク検索エラー: {str(e)}")
+            error = e
+        self._record_status("コトバンク", "コトバンク検索エラー", concepts, error, deadline)
 
-        return list(set(concepts))[:max_concepts]
+        return rank_concepts(concepts, max_concepts)
 
     
-    def search_google_related(self, word: str, max_concepts: int = 8) -> List[str]:
+    def search_google_related(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                              extractor: Optional[ConceptTokenizer] = None) -> List[str]:
         """Google検索の関連キーワードを取得（シミュレーション）"""
         # 実際のGoogle検索APIは有料のため、シミュレーションデータを使用
         related_patterns = {
@@ -127,35 +2070,378 @@ class WebConceptScraper:
         #     additional = ["創造", "発想", "アイデア", "革新", "変化", "成長", "発展", "進歩"]
         #     concepts.extend(random.sample(additional, min(max_concepts - len(concepts), len(additional))))
 
-        return concepts[:max_concepts]
-
-    def _extract_concepts_from_text(self, text: str, max_concepts: int = 5) -> List[str]:
-        """テキストから概念を抽出（簡易版）"""
-        if not text:
-            return []
+        if deadline is not None:
+            deadline.mark("関連検索", "complete")
+        return rank_concepts(concepts, max_concepts)
+
+    def search_source(self, source: str, word: str, deadline: Deadline,
+                      extractor: str = DEFAULT_EXTRACTION_BACKEND) -> List[str]:
+        """1つのソースを検索（同じ単語・ソース・抽出方式の同時検索はsingle-flightで共有）"""
+        def fetch():
+            concepts = getattr(self, SOURCE_METHODS[source])(word, deadline=deadline,
+                                                             extractor=self.extractors[extractor])
+            return concepts, deadline.statuses.get(source, "complete")
+
+        concepts, status = self.flight.do((source, word, extractor), fetch, timeout=deadline.remaining())
+        deadline.mark(source, status)
+        return concepts
+
+    def extract_concepts_batch(self, texts: List[str], max_concepts: int = 5,
+                               extractor: Optional[ConceptTokenizer] = None,
+                               max_merged: Optional[int] = None) -> ExtractionBatch:
+        """複数のテキストから1回の呼び出しで概念を抽出（全ソース共通の入口、抽出済みの本文は再利用）"""
+        extractor = extractor if extractor is not None else CONCEPT_TOKENIZER
+        keys = [ExtractionCache.make_key(text, extractor.name, max_concepts) for text in texts]
+        per_text = [self.extraction_cache.get(key) for key in keys]
+
+        # キャッシュに無いテキストだけをまとめて抽出
+        missing = [i for i, concepts in enumerate(per_text) if concepts is None]
+        if missing:
+            extracted = extractor.extract_batch([texts[i] for i in missing], max_concepts).per_text
+            for i, concepts in zip(missing, extracted):
+                per_text[i] = concepts
+                self.extraction_cache.put(keys[i], concepts)
+        return ExtractionBatch.from_per_text(per_text, max_merged)
+
+    def _extract_concepts_from_text(self, text: str, max_concepts: int = 5,
+                                    extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """テキストから概念を抽出（抽出方式の指定が無ければ正規表現トークナイザー）"""
+        return self.extract_concepts_batch([text], max_concepts, extractor).per_text[0]
+
+
+class AsyncWebConceptScraper:
+    """1つの非同期HTTPクライアント上で全ソースのリクエストを同時に実行するスクレイパー"""
+
+    def __init__(self, scraper: Optional[WebConceptScraper] = None):
+        # キャッシュと概念抽出は同期版のスクレイパーと共有する
+        self.scraper = scraper if scraper is not None else WebConceptScraper()
+        self.client = None
+
+    async def __aenter__(self):
+        # 記録・再生中は全ての送受信を同期セッションのアダプター経由にする
+        if aiohttp is not None and self.scraper.fixture_adapter is None:
+            self.client = aiohttp.ClientSession(headers=self.scraper.headers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def _get(self, url: str, params: Optional[Dict] = None, timeout: float = 5,
+                   source: Optional[str] = None, deadline: Optional[Deadline] = None,
+                   reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """キャッシュを経由して非同期にGETリクエストを送信"""
+        if self.client is None:
+            return await asyncio.to_thread(self.scraper._get, url, params, timeout, source, deadline, reader)
+
+        key, cached = self.scraper._cache_lookup(url, params)
+        if cached is not None and cached.is_fresh():
+            return cached.to_response()
+        fallback = self.scraper._check_circuit(source, cached)
+        if fallback is not None:
+            return fallback
+
+        headers = cached.validators() if cached is not None else {}
+        breaker = self.scraper.breakers.get(source)
+        try:
+            response = await self._fetch(key, headers, timeout, deadline, reader)
+        except Exception as e:
+            self.scraper._record_failure(breaker, deadline, e)
+            raise
+        if breaker is not None:
+            breaker.record(response)
+        return self.scraper._cache_store(key, cached, response)
+
+    async def _fetch(self, url: str, headers: Dict[str, str], timeout: float,
+                     deadline: Optional[Deadline] = None,
+                     reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """冪等なGETを指数バックオフ（ジッター付き）で再試行（制限時間内に限る）"""
+        for attempt in range(RETRY_ATTEMPTS):
+            last_attempt = attempt == RETRY_ATTEMPTS - 1
+            response = None
+            try:
+                response = await self._hedged_send(url, headers, timeout, deadline, reader)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt or (deadline is not None and deadline.expired()):
+                    raise
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUS_CODES:
+                    return response
+            delay = _backoff_delay(attempt, response)
+            if deadline is not None and delay >= deadline.remaining():
+                if response is not None:
+                    return response
+                raise DeadlineExceeded("検索の制限時間内に再試行できません")
+            await asyncio.sleep(delay)
+
+    async def _hedged_send(self, url: str, headers: Dict[str, str], timeout: float,
+                           deadline: Optional[Deadline] = None,
+                           reader: Optional[DictionaryPageReader] = None) -> requests.Response:
+        """応答がパーセンタイルを超えて遅ければ複製を送り、先に返った方を採用"""
+        hedging = self.scraper.hedging
+        if hedging is None or not hedging.covers(url) or reader is not None:
+            return await self._send(url, headers, timeout, deadline, reader)
+
+        delay = hedging.hedge_delay(url)
+        primary = asyncio.ensure_future(self._timed_send(url, headers, timeout, deadline))
+        hedge = None
+        hedge_sent = asyncio.Event()
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done or not hedging.try_acquire_hedge():
+                return await primary
+
+            hedge = asyncio.ensure_future(self._timed_send(url, headers, timeout, deadline, sent=hedge_sent))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedging.record_win()
+                        return task.result()
+            return await primary
+        finally:
+            # 負けた側や、呼び出し元が取り消された場合の送信も打ち切る（asyncio.waitは待つ対象を取り消さない）
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+            if hedge is not None and not hedge_sent.is_set():
+                # 送信枠を得る前に打ち切った・待ちきれなかった複製は送っていないため、ヘッジの数から外す
+                hedging.release_hedge()
+
+    async def _timed_send(self, url: str, headers: Dict[str, str], timeout: float,
+                          deadline: Optional[Deadline] = None,
+                          sent: Optional[asyncio.Event] = None) -> requests.Response:
+        started = time.monotonic()
+        response = await self._send(url, headers, timeout, deadline, sent=sent)
+        self.scraper.hedging.record_latency(url, time.monotonic() - started)
+        return response
+
+    async def _send(self, url: str, headers: Dict[str, str], timeout: float,
+                    deadline: Optional[Deadline] = None,
+                    reader: Optional[DictionaryPageReader] = None,
+                    sent: Optional[asyncio.Event] = None) -> requests.Response:
+        """ホストのレート制限に従って非同期にリクエストを送信（sentは送信を始めたときにセット）"""
+        bucket = self.scraper.rate_limiter.bucket_for(url)
+        queue_timeout = RATE_LIMIT_QUEUE_TIMEOUT if deadline is None else deadline.timeout(RATE_LIMIT_QUEUE_TIMEOUT)
+        # 送信枠の確保からtry/finallyまでの間にawaitを挟まない（取り消されても枠が返らなくなるため）
+        await bucket.acquire_async(queue_timeout)
+        capped = False
+        if deadline is not None:
+            try:
+                limited = deadline.timeout(timeout)
+            except DeadlineExceeded:
+                bucket.release()
+                raise
+            capped, timeout = limited < timeout, limited
+        if sent is not None:
+            sent.set()
+        response = None
+        throttled = False
+        incomplete = False
+        try:
+            async with self.client.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if reader is not None:
+                    reader.begin(resp.headers)
+                if reader is not None and resp.status == 200:
+                    body, incomplete = await self._read_streamed(resp, reader, deadline)
+                else:
+                    body = await resp.read()
+
+            response = requests.Response()
+            response.incomplete = incomplete
+            response.url = str(resp.url)
+            response.status_code = resp.status
+            response.headers = requests.structures.CaseInsensitiveDict(resp.headers)
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            response._content = body
+            throttled = response.status_code in THROTTLE_STATUS_CODES
+            return response
+        except asyncio.TimeoutError:
+            throttled = not capped
+            raise
+        finally:
+            bucket.release(throttled, _retry_after_seconds(response))
 
-        # HTMLタグを除去
-        text = re.sub(r'<[^>]+>', '', text)
+    @staticmethod
+    async def _read_streamed(resp, reader: DictionaryPageReader,
+                             deadline: Optional[Deadline] = None) -> Tuple[bytes, bool]:
+        """本文を少しずつreaderに渡し、十分に揃うか上限に達したら受信を打ち切る"""
+        chunks = []
+        size = 0
+        incomplete = False
+        try:
+            async for chunk in resp.content.iter_chunked(PARSER_FEED_SIZE):
+                chunk = chunk[:STREAM_MAX_BYTES - size]
+                chunks.append(chunk)
+                size += len(chunk)
+                if reader.feed(chunk) or size >= STREAM_MAX_BYTES:
+                    break
+                if deadline is not None and deadline.expired():
+                    incomplete = True
+                    break
+        except asyncio.TimeoutError:
+            # 検索の残り時間で区切ったタイムアウトで止まった場合も、受信済みの本文は一部として使う
+            if not chunks or deadline is None or not deadline.expired():
+                raise
+            incomplete = True
+        return b''.join(chunks), incomplete
+
+    async def search_wikipedia(self, word: str, max_concepts: int = 10, deadline: Optional[Deadline] = None,
+                               extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """Wikipedia検索から関連概念を取得（検索上位ページの導入文・リンク・カテゴリを1回で取得）"""
+        concepts = []
+        error = None
+        try:
+            indexed = self.scraper._wikipedia_from_index(word, max_concepts, deadline)
+            if indexed is not None:
+                return indexed
+            _, params = self.scraper._wikipedia_search_params(word)
+            pages, _ = await self._wikipedia_query(params, deadline)
+            concepts.extend(self.scraper._concepts_from_wikipedia_pages(pages, word, max_concepts, extractor))
+        except Exception as e:
+            error = e
+        self.scraper._record_status("Wikipedia", "Wikipedia検索エラー", concepts, error, deadline)
+
+        return concepts
+
+    async def _wikipedia_query(self, params: Dict,
+                               deadline: Optional[Deadline] = None) -> Tuple[List[Dict], Dict[str, str]]:
+        """MediaWiki APIに問い合わせ、続きを含めてページと表記ゆれ・リダイレクトの対応を返す"""
+        pages = {}
+        aliases = {}
+        params = dict(params)
+        for _ in range(WIKIPEDIA_MAX_CONTINUES + 1):
+            response = await self._get(WIKIPEDIA_API_URL, params=params, timeout=5, source="Wikipedia",
+                                       deadline=deadline)
+            self.scraper._raise_for_failed_status(response)
+            if response.status_code != 200:
+                break
+            continuation = self.scraper._merge_wikipedia_query(pages, aliases, response.json())
+            if continuation is None:
+                break
+            params.update(continuation)
+        return list(pages.values()), aliases
+
+    async def _search_dictionary(self, url: str, source: str, max_concepts: int, deadline: Optional[Deadline],
+                                 extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        concepts = []
+        error = None
+        try:
+            reader = self.scraper._dictionary_reader()
+            response = await self._get(url, timeout=5, source=source, deadline=deadline, reader=reader)
+            if reader is None and response.status_code == 200:
+                key, page_concepts = self.scraper._page_memo(response, max_concepts, extractor)
+                if page_concepts is None:
+                    # プロセスプールでの解析はイベントループを止めずに待つ
+                    future = self.scraper._submit_dictionary_page(response, max_concepts, extractor)
+                    page_concepts = await asyncio.wait_for(
+                        asyncio.wrap_future(future), deadline.remaining() if deadline is not None else None
+                    )
+                    self.scraper.extraction_cache.put(key, page_concepts)
+                concepts.extend(page_concepts)
+            else:
+                concepts.extend(self.scraper._concepts_from_dictionary_page(response, max_concepts, reader,
+                                                                            extractor))
+            self.scraper._raise_if_incomplete(response)
+        except Exception as e:
+            error = e
+        self.scraper._record_status(source, f"{source}検索エラー", concepts, error, deadline)
 
-        # 日本語の名詞っぽい単語を抽出（簡易版）
-        # カタカナ、ひらがな、漢字の組み合わせ
-        patterns = [
-            r'[ァ-ヶー]{2,8}',  # カタカナ
-            r'[一-龯]{2,6}',  # 漢字
-            r'[ぁ-ゖ]{2,6}',  # ひらがな
-        ]
+        return rank_concepts(concepts, max_concepts)
 
-        concepts = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            concepts.extend(matches)
+    async def search_weblio(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                            extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """Weblio辞書から関連概念を取得"""
+        return await self._search_dictionary(self.scraper._weblio_url(word), "Weblio", max_concepts, deadline,
+                                             extractor)
 
-        # 不要な単語を除外
-        exclude_words = {'です', 'ます', 'である', 'として', 'について', 'により', 'によって', 'から', 'まで', 'など',
-                         'こと', 'もの', 'ため', 'ところ', 'とき', 'ここ', 'そこ', 'あそこ', 'これ', 'それ', 'あれ'}
-        concepts = [c for c in concepts if c not in exclude_words and len(c) >= 2]
+    async def search_kotobank(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                              extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """コトバンクから関連概念を取得"""
+        return await self._search_dictionary(self.scraper._kotobank_url(word), "コトバンク", max_concepts, deadline,
+                                             extractor)
 
-        return list(set(concepts))[:max_concepts]
+    async def search_google_related(self, word: str, max_concepts: int = 8, deadline: Optional[Deadline] = None,
+                                    extractor: Optional[ConceptTokenizer] = None) -> List[str]:
+        """Google検索の関連キーワードを取得（シミュレーション）"""
+        return self.scraper.search_google_related(word, max_concepts, deadline=deadline)
+
+    async def search_source(self, source: str, word: str, deadline: Deadline,
+                            extractor: str = DEFAULT_EXTRACTION_BACKEND) -> List[str]:
+        """1つのソースを検索（同じ単語・ソース・抽出方式の同時検索はsingle-flightで共有）"""
+        async def fetch():
+            concepts = await getattr(self, SOURCE_METHODS[source])(word, deadline=deadline,
+                                                                   extractor=self.scraper.extractors[extractor])
+            return concepts, deadline.statuses.get(source, "complete")
+
+        concepts, status = await self.scraper.flight.do_async((source, word, extractor), fetch,
+                                                              timeout=deadline.remaining())
+        deadline.mark(source, status)
+        return concepts
+
+    async def search_all(self, word: str, sources: Optional[List[str]] = None, deadline: Optional[Deadline] = None,
+                         extractor: str = DEFAULT_EXTRACTION_BACKEND) -> Dict[str, List[str]]:
+        """指定したソース（省略時は全ソース）を制限時間内で同時に検索"""
+        deadline = deadline if deadline is not None else Deadline()
+        sources = SEARCH_SOURCES if sources is None else sources
+        tasks = {source: asyncio.ensure_future(self.search_source(source, word, deadline, extractor))
+                 for source in sources}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=deadline.remaining())
+
+        concepts = {}
+        for source, task in tasks.items():
+            concepts[source] = []
+            if not task.done():
+                # 制限時間までに終わらなかったソースは打ち切る
+                task.cancel()
+                deadline.mark(source, "timeout")
+            elif task.cancelled() or isinstance(task.exception(), DEADLINE_ERRORS):
+                deadline.mark(source, "timeout")
+            elif task.exception() is not None:
+                st.warning(f"{source}の検索でエラーが発生しました: {str(task.exception())}")
+                deadline.mark(source, "error")
+            else:
+                concepts[source] = task.result()
+        return concepts
+
+
+def ingest_wikipedia_dump(path: str, index: WikipediaIndex, scraper: WebConceptScraper,
+                          extractor: Optional[ConceptTokenizer] = None, max_concepts: int = WIKI_INDEX_CONCEPTS,
+                          batch_size: int = 1000, limit: Optional[int] = None, progress=None) -> Dict[str, float]:
+    """Wikipediaのダンプを逐次読み、各ページの概念を抽出して索引に書き込む
+
+    progressを渡すと、書き込みのたびに処理済みページ数を渡して呼び出す。
+    """
+    start = time.perf_counter()
+    pages = 0
+    rows = []
+    for page in iter_wikipedia_dump(path):
+        if not page['title']:
+            continue
+        pages += 1
+        concepts = scraper._concepts_from_wikipedia_pages([page], page['title'], max_concepts, extractor)
+        if concepts:
+            rows.append((page['title'], concepts))
+        if len(rows) >= batch_size:
+            index.put_many(rows)
+            rows = []
+            if progress is not None:
+                progress(pages)
+        if limit is not None and pages >= limit:
+            break
+    if rows:
+        index.put_many(rows)
+        if progress is not None:
+            progress(pages)
+
+    elapsed = time.perf_counter() - start
+    return {"pages": pages, "seconds": elapsed, "pages_per_second": pages / elapsed if elapsed else 0.0}
 
 
 class ConceptVisualizer:
@@ -227,6 +2513,34 @@ class ConceptVisualizer:
         return svg_content
 
 
+@st.cache_resource
+def get_shared_scraper() -> WebConceptScraper:
+    """全ユーザーセッション・再実行で共有するスクレイパーを取得"""
+    return WebConceptScraper(hedging=HedgePolicy(), parse_workers=PARSE_WORKERS,
+                             wiki_index=WikipediaIndex.open_existing())
+
+
+def close_shared_scraper():
+    """共有スクレイパーを作り直す（古いインスタンスは他のセッションの検索が終わってから閉じる）"""
+    old = get_shared_scraper()
+    # 先にキャッシュを外し、以降の呼び出しには新しいインスタンスを渡す
+    get_shared_scraper.clear()
+    old.retire()
+
+
+@contextmanager
+def shared_scraper() -> Iterator[WebConceptScraper]:
+    """共有スクレイパーを利用中として借りる（リセットで退役したインスタンスは使わない）"""
+    while True:
+        scraper = get_shared_scraper()
+        if scraper.try_enter():
+            break
+    try:
+        yield scraper
+    finally:
+        scraper.leave()
+
+
 def initialize_session_state():
     """セッション状態を初期化"""
     if 'current_word' not in st.session_state:
@@ -235,53 +2549,793 @@ def initialize_session_state():
         st.session_state.concepts = {}
     if 'search_history' not in st.session_state:
         st.session_state.search_history = []
-    if 'concept_dictionary' not in st.session_state:
-        st.session_state.concept_dictionary = {}
 
 
-def search_concepts_parallel(scraper: WebConceptScraper, word: str) -> Dict[str, List[str]]:
-    """並列で複数のソースから概念を検索"""
+def search_concepts_parallel(scraper: WebConceptScraper, word: str, sources: Optional[List[str]] = None,
+                             deadline: Optional[Deadline] = None,
+                             extractor: str = DEFAULT_EXTRACTION_BACKEND) -> Dict[str, List[str]]:
+    """並列で複数のソースから概念を検索（制限時間を過ぎたソースは空の結果で返す）"""
     concepts = {}
-
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # 各検索を並列実行
+    deadline = deadline if deadline is not None else Deadline()
+    sources = SEARCH_SOURCES if sources is None else sources
+    if not sources:
+        return concepts
+
+    # 制限時間で打ち切った検索の終了は待たない（各リクエストも制限時間で打ち切られる）
+    executor = ThreadPoolExecutor(max_workers=len(sources))
+    try:
+        # 各検索を並列実行（全ソースが同時に走るようソース数分のワーカーを用意）
         future_to_source = {
-            executor.submit(scraper.search_wikipedia, word): "Wikipedia",
-            executor.submit(scraper.search_weblio, word): "Weblio",
-            executor.submit(scraper.search_kotobank, word): "コトバンク",
-            executor.submit(scraper.search_google_related, word): "関連検索"
+            executor.submit(scraper.search_source, source, word, deadline, extractor): source
+            for source in sources
         }
+        wait(future_to_source, timeout=deadline.remaining())
+
+        for future, source in future_to_source.items():
+            concepts[source] = []
+            if not future.done():
+                deadline.mark(source, "timeout")
+            elif isinstance(future.exception(), DEADLINE_ERRORS):
+                deadline.mark(source, "timeout")
+            elif future.exception() is not None:
+                st.warning(f"{source}の検索でエラーが発生しました: {str(future.exception())}")
+                deadline.mark(source, "error")
+            else:
+                concepts[source] = future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        for future in as_completed(future_to_source):
-            source = future_to_source[future]
-            try:
-                result = future.result(timeout=10)
-                concepts[source] = result
-            except Exception as e:
-                st.warning(f"{source}の検索でエラーが発生しました: {str(e)}")
-                concepts[source] = []
+    return concepts
+
+
+def search_concepts_async(scraper: WebConceptScraper, word: str, sources: Optional[List[str]] = None,
+                          deadline: Optional[Deadline] = None,
+                          extractor: str = DEFAULT_EXTRACTION_BACKEND) -> Dict[str, List[str]]:
+    """asyncioエンジンで複数のソースから概念を検索（同期呼び出し用ラッパー）"""
+    async def run():
+        async with AsyncWebConceptScraper(scraper) as async_scraper:
+            return await async_scraper.search_all(word, sources, deadline, extractor)
+
+    return asyncio.run(run())
 
+
+# サイドバーで選択できる検索エンジン
+SEARCH_ENGINES = {
+    "asyncio": search_concepts_async,
+    "スレッド並列": search_concepts_parallel,
+}
+
+
+class SearchResultCache:
+    """単語とソースの組み合わせをキーに検索結果を共有するLRU+TTLキャッシュ"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(word: str, sources: List[str],
+                 extractor: str = DEFAULT_EXTRACTION_BACKEND) -> Tuple[str, Tuple[str, ...], str]:
+        return word, tuple(sorted(sources)), extractor
+
+    def get(self, key) -> Optional[Dict[str, List[str]]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return {source: list(concepts) for source, concepts in entry[1].items()}
+
+    def put(self, key, concepts: Dict[str, List[str]]):
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl,
+                                 {source: list(values) for source, values in concepts.items()})
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def purge(self):
+        """全エントリと統計を消去"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+@st.cache_resource
+def get_search_result_cache() -> SearchResultCache:
+    """全ユーザーセッションで共有する検索結果キャッシュを取得"""
+    return SearchResultCache()
+
+
+def search_concepts_cached(scraper: WebConceptScraper, word: str, sources: List[str],
+                           engine=search_concepts_parallel, deadline: Optional[Deadline] = None,
+                           extractor: str = DEFAULT_EXTRACTION_BACKEND) -> Dict[str, List[str]]:
+    """共有キャッシュを確認してから検索（空の結果や制限時間内に揃わなかった結果はキャッシュしない）"""
+    deadline = deadline if deadline is not None else Deadline()
+    cache = get_search_result_cache()
+    key = SearchResultCache.make_key(word, sources, extractor)
+    concepts = cache.get(key)
+    if concepts is not None:
+        for source in concepts:
+            deadline.mark(source, "complete")
+        return concepts
+
+    concepts = engine(scraper, word, sources, deadline, extractor)
+    complete = all(status == "complete" for status in deadline.statuses.values())
+    if any(concepts.values()) and complete:
+        cache.put(key, concepts)
     return concepts
 
 
-def save_concepts_to_dictionary(word: str, concepts: Dict[str, List[str]]):
-    """検索した概念を辞書に保存"""
+# 概念辞書の保存先
+CONCEPT_STORE_PATH = os.environ.get("NEWCONCEPT_STORE_DB", ".newconcept_concepts.sqlite3")
+
+
+class ConceptStore:
+    """単語・概念・ソースを正規化して保存するSQLiteの概念辞書（全セッションで共有）"""
+
+    def __init__(self, path: str = CONCEPT_STORE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS words (
+                    id INTEGER PRIMARY KEY,
+                    word TEXT NOT NULL UNIQUE,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS concepts (
+                    id INTEGER PRIMARY KEY,
+                    concept TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS sources (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS word_concepts (
+                    word_id INTEGER NOT NULL REFERENCES words (id) ON DELETE CASCADE,
+                    source_id INTEGER NOT NULL REFERENCES sources (id),
+                    concept_id INTEGER NOT NULL REFERENCES concepts (id),
+                    rank INTEGER NOT NULL,
+                    PRIMARY KEY (word_id, source_id, concept_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_word_concepts_concept ON word_concepts (concept_id);
+                CREATE INDEX IF NOT EXISTS idx_words_updated ON words (updated_at);
+                CREATE TABLE IF NOT EXISTS empty_searches (
+                    word TEXT NOT NULL,
+                    source_id INTEGER NOT NULL REFERENCES sources (id),
+                    searched_at REAL NOT NULL,
+                    PRIMARY KEY (word, source_id)
+                ) WITHOUT ROWID;
+            """)
+            self.conn.commit()
+
+    def _ids(self, table: str, column: str, values: List[str]) -> Dict[str, int]:
+        """値をまとめて登録し、値→IDの対応を返す（ロック取得済みで呼ぶ）"""
+        values = list(dict.fromkeys(values))
+        self.conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", [(value,) for value in values])
+        ids = {}
+        # SQLiteのパラメータ数の上限を超えないよう分割して引く
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(self.conn.execute(
+                f"SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})", chunk
+            ).fetchall())
+        return ids
+
+    def save_many(self, entries: List[Tuple[str, Dict[str, List[str]]]], merge: bool = False) -> int:
+        """複数の単語の概念を1トランザクションで保存し、新たに加わった対応の数を返す
+
+        保存したソースの概念は置き換える。merge=Trueなら既存の概念は残し、未登録の概念だけを後ろに加える。
+        """
+        entries = [(word, {source: values for source, values in concepts.items() if values})
+                   for word, concepts in entries]
+        entries = [(word, concepts) for word, concepts in entries if concepts]
+        if not entries:
+            return 0
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO words (word, updated_at) VALUES (?, ?) "
+                "ON CONFLICT (word) DO UPDATE SET updated_at = excluded.updated_at",
+                [(word, now) for word, _ in entries]
+            )
+            word_ids = self._ids("words", "word", [word for word, _ in entries])
+            source_ids = self._ids("sources", "name", [source for _, concepts in entries for source in concepts])
+            concept_ids = self._ids("concepts", "concept", [
+                concept for _, concepts in entries for values in concepts.values() for concept in values
+            ])
+
+            offsets: Dict[Tuple[int, int], int] = {}
+            if merge:
+                # 既存の概念の後ろに並ぶよう、単語・ソースごとの最大の順位を引いておく
+                ids = list(set(word_ids.values()))
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    for word_id, source_id, rank in self.conn.execute(
+                            f"SELECT word_id, source_id, MAX(rank) FROM word_concepts "
+                            f"WHERE word_id IN ({placeholders}) GROUP BY word_id, source_id", chunk):
+                        offsets[word_id, source_id] = rank + 1
+            else:
+                self.conn.executemany(
+                    "DELETE FROM word_concepts WHERE word_id = ? AND source_id = ?",
+                    [(word_ids[word], source_ids[source]) for word, concepts in entries for source in concepts]
+                )
+            changes = self.conn.total_changes
+            rows = []
+            for word, concepts in entries:
+                word_id = word_ids[word]
+                for source, values in concepts.items():
+                    source_id = source_ids[source]
+                    offset = offsets.get((word_id, source_id), 0)
+                    if merge:
+                        # 同じバッチで同じ単語が続いても順位が重ならないようにする
+                        offsets[word_id, source_id] = offset + len(values)
+                    rows.extend((word_id, source_id, concept_ids[concept], offset + rank)
+                                for rank, concept in enumerate(values))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO word_concepts (word_id, source_id, concept_id, rank) VALUES (?, ?, ?, ?)", rows
+            )
+            return self.conn.total_changes - changes
+
+    def save(self, word: str, concepts: Dict[str, List[str]]):
+        self.save_many([(word, concepts)])
+
+    def mark_empty(self, word: str, sources: List[str]):
+        """最後まで検索して概念が見つからなかったソースを記録する（単語の一覧には加えない）"""
+        if not sources:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            source_ids = self._ids("sources", "name", sources)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO empty_searches (word, source_id, searched_at) VALUES (?, ?, ?)",
+                [(word, source_ids[source], now) for source in dict.fromkeys(sources)]
+            )
+
+    def empty_sources(self, word: str) -> Set[str]:
+        """単語を検索して概念が見つからなかったソースを返す"""
+        with self.lock:
+            return {source for source, in self.conn.execute("""
+                SELECT sources.name
+                FROM empty_searches
+                JOIN sources ON sources.id = empty_searches.source_id
+                WHERE empty_searches.word = ?
+            """, (word,))}
+
+    def get(self, word: str) -> Optional[Dict[str, List[str]]]:
+        """単語のソースごとの概念を保存順に返す（未登録ならNone）"""
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT sources.name, concepts.concept
+                FROM words
+                JOIN word_concepts ON word_concepts.word_id = words.id
+                JOIN sources ON sources.id = word_concepts.source_id
+                JOIN concepts ON concepts.id = word_concepts.concept_id
+                WHERE words.word = ?
+                ORDER BY sources.id, word_concepts.rank
+            """, (word,)).fetchall()
+        if not rows:
+            return None
+        concepts = {}
+        for source, concept in rows:
+            concepts.setdefault(source, []).append(concept)
+        return concepts
+
+    def contains_many(self, words: List[str]) -> Set[str]:
+        """登録済みの単語だけを返す"""
+        words = list(dict.fromkeys(words))
+        found = set()
+        with self.lock:
+            for start in range(0, len(words), 500):
+                chunk = words[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(word for word, in self.conn.execute(
+                    f"SELECT word FROM words WHERE word IN ({placeholders})", chunk
+                ))
+        return found
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+
+    def recent(self, limit: int = 5) -> List[Tuple[str, List[str]]]:
+        """最近更新した単語と、その概念（全ソースを統合した順位）を返す"""
+        with self.lock:
+            words = [word for word, in self.conn.execute(
+                "SELECT word FROM words ORDER BY updated_at DESC LIMIT ?", (limit,)
+            )]
+        return [(word, merge_source_concepts(self.get(word) or {})) for word in words]
+
+    def iter_entries(self, since: Optional[float] = None,
+                     batch_size: int = 500) -> Iterator[Tuple[str, float, Dict[str, List[str]]]]:
+        """単語・更新時刻・ソースごとの概念を少しずつ読み出す（sinceより後に更新した単語のみも可）"""
+        last_id = 0
+        since = since if since is not None else -1.0
+        while True:
+            # 読み出しの合間は他のセッションが書き込めるよう、ロックはバッチごとに取る
+            with self.lock:
+                words = self.conn.execute(
+                    "SELECT id, word, updated_at FROM words WHERE id > ? AND updated_at > ? ORDER BY id LIMIT ?",
+                    (last_id, since, batch_size)
+                ).fetchall()
+                if not words:
+                    return
+                placeholders = ",".join("?" * len(words))
+                rows = self.conn.execute(f"""
+                    SELECT word_concepts.word_id, sources.name, concepts.concept
+                    FROM word_concepts
+                    JOIN sources ON sources.id = word_concepts.source_id
+                    JOIN concepts ON concepts.id = word_concepts.concept_id
+                    WHERE word_concepts.word_id IN ({placeholders})
+                    ORDER BY word_concepts.word_id, word_concepts.source_id, word_concepts.rank
+                """, [word_id for word_id, _, _ in words]).fetchall()
+            concepts: Dict[int, Dict[str, List[str]]] = {}
+            for word_id, source, concept in rows:
+                concepts.setdefault(word_id, {}).setdefault(source, []).append(concept)
+            for word_id, word, updated_at in words:
+                yield word, updated_at, concepts.get(word_id, {})
+            last_id = words[-1][0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+@st.cache_resource
+def get_concept_store() -> ConceptStore:
+    """全ユーザーセッション・再実行で共有する概念辞書を取得"""
+    return ConceptStore()
+
+
+class ReverseHit(NamedTuple):
+    """逆引きの結果（概念を得た単語と、その概念を返したソース）"""
+    word: str
+    sources: Tuple[str, ...]
+    count: int
+
+
+# 辺は「相手のシンボルID << CONCEPT_SOURCE_BITS | ソースID」の32ビット整数1つで表す
+CONCEPT_SOURCE_BITS = 6
+CONCEPT_SOURCE_MASK = (1 << CONCEPT_SOURCE_BITS) - 1
+CONCEPT_MAX_SYMBOLS = 1 << (32 - CONCEPT_SOURCE_BITS)
+
+
+class SymbolTable:
+    """文字列を連番の整数IDに対応付ける表（同じ文字列は1つだけ保持）"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def intern(self, name: str) -> int:
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def get(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+    def __getitem__(self, symbol: int) -> str:
+        return self.names[symbol]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class ConceptIndex:
+    """概念→単語の転置インデックス（辞書への保存に合わせて差分で更新）
+
+    単語と概念は共通のSymbolTableで整数IDにし、隣接は32ビット整数の配列で持つ。
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.symbols = SymbolTable()
+        self.sources = SymbolTable()
+        # 単語ID→(概念ID, ソースID)の配列（ソースごとに保存順。置き換え時に古い対応を外すために保持）
+        self.forward: List[Optional[array]] = []
+        # 概念ID→(単語ID, ソースID)の配列
+        self.postings: List[Optional[array]] = []
+        self.counts = {"words": 0, "concepts": 0, "links": 0}
+
+    @classmethod
+    def from_store(cls, store: ConceptStore) -> 'ConceptIndex':
+        """保存済みの辞書から索引を構築"""
+        index = cls()
+        for word, _, concepts in store.iter_entries():
+            index.update(word, concepts)
+        return index
+
+    def _symbol(self, name: str) -> int:
+        symbol = self.symbols.intern(name)
+        if symbol >= CONCEPT_MAX_SYMBOLS:
+            raise ValueError("概念グラフの語数が上限を超えました")
+        if symbol == len(self.forward):
+            self.forward.append(None)
+            self.postings.append(None)
+        return symbol
+
+    def check_sources(self, names: Set[str]):
+        """新しいソースを加えてもソース数の上限を超えないか確認（超えるならValueError）"""
+        with self.lock:
+            added = {name for name in names if self.sources.get(name) is None}
+            if len(self.sources) + len(added) > CONCEPT_SOURCE_MASK + 1:
+                raise ValueError(f"概念グラフのソースは{CONCEPT_SOURCE_MASK + 1}種類までです")
+
+    def _source(self, name: str) -> int:
+        source = self.sources.intern(name)
+        if source > CONCEPT_SOURCE_MASK:
+            raise ValueError(f"概念グラフのソースは{CONCEPT_SOURCE_MASK + 1}種類までです")
+        return source
+
+    def _unlink(self, word_id: int, concept_id: int, source_id: int):
+        postings = self.postings[concept_id]
+        postings.remove(word_id << CONCEPT_SOURCE_BITS | source_id)
+        if not postings:
+            self.postings[concept_id] = None
+            self.counts["concepts"] -= 1
+        self.counts["links"] -= 1
+
+    def update(self, word: str, concepts: Dict[str, List[str]], merge: bool = False):
+        """単語のソースごとの概念を置き換える（概念が空のソースはそのまま、merge=Trueなら既存の概念に加える）"""
+        with self.lock:
+            word_id = self._symbol(word)
+            edges = self.forward[word_id]
+            if edges is None:
+                edges = self.forward[word_id] = array("I")
+                self.counts["words"] += 1
+            for source, values in concepts.items():
+                if not values:
+                    continue
+                source_id = self._source(source)
+                saved = [edge >> CONCEPT_SOURCE_BITS for edge in edges if edge & CONCEPT_SOURCE_MASK == source_id]
+                if merge:
+                    seen = set(saved)
+                elif saved:
+                    for concept_id in saved:
+                        self._unlink(word_id, concept_id, source_id)
+                    edges = self.forward[word_id] = array(
+                        "I", [edge for edge in edges if edge & CONCEPT_SOURCE_MASK != source_id])
+                    seen = set()
+                else:
+                    seen = set()
+                for concept in values:
+                    concept_id = self._symbol(concept)
+                    if concept_id in seen:
+                        continue
+                    seen.add(concept_id)
+                    edges.append(concept_id << CONCEPT_SOURCE_BITS | source_id)
+                    postings = self.postings[concept_id]
+                    if postings is None:
+                        postings = self.postings[concept_id] = array("I")
+                        self.counts["concepts"] += 1
+                    postings.append(word_id << CONCEPT_SOURCE_BITS | source_id)
+                    self.counts["links"] += 1
+
+    def lookup(self, concept: str) -> List[ReverseHit]:
+        """概念を得た単語を、多くのソースが返した順に返す（計算量は結果の件数に比例）"""
+        with self.lock:
+            concept_id = self.symbols.get(concept)
+            postings = self.postings[concept_id] if concept_id is not None else None
+            sources: Dict[int, List[str]] = {}
+            for edge in postings or ():
+                sources.setdefault(edge >> CONCEPT_SOURCE_BITS, []).append(self.sources[edge & CONCEPT_SOURCE_MASK])
+            hits = [ReverseHit(self.symbols[word_id], tuple(sorted(names)), len(names))
+                    for word_id, names in sources.items()]
+        hits.sort(key=lambda hit: (-hit.count, hit.word))
+        return hits
+
+    def neighbours(self, word: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """共通の概念が多い単語を、共通する概念の数とともに返す"""
+        with self.lock:
+            word_id = self.symbols.get(word)
+            edges = self.forward[word_id] if word_id is not None else None
+            shared: Dict[int, int] = {}
+            for concept_id in {edge >> CONCEPT_SOURCE_BITS for edge in edges or ()}:
+                for other in {edge >> CONCEPT_SOURCE_BITS for edge in self.postings[concept_id]}:
+                    if other != word_id:
+                        shared[other] = shared.get(other, 0) + 1
+            shared_words = [(self.symbols[other], count) for other, count in shared.items()]
+        return heapq.nsmallest(limit, shared_words, key=lambda item: (-item[1], item[0]))
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+@st.cache_resource
+def get_concept_index() -> ConceptIndex:
+    """全ユーザーセッションで共有する転置インデックスを取得（初回に辞書から構築）"""
+    return ConceptIndex.from_store(get_concept_store())
+
+
+def merge_source_concepts(concepts: Dict[str, List[str]]) -> List[str]:
+    """ソースごとの概念を重複なくまとめ、複数ソースに現れた概念ほど前に並べる"""
     all_concepts = []
     for concept_list in concepts.values():
         all_concepts.extend(concept_list)
+    return rank_concepts(all_concepts, len(all_concepts))
 
-    # 重複を除去
-    unique_concepts = list(set(all_concepts))
 
-    if unique_concepts:
-        st.session_state.concept_dictionary[word] = unique_concepts
+def save_entries_to_dictionary(entries: List[Tuple[str, Dict[str, List[str]]]]):
+    """複数の単語の概念を辞書に保存し、転置インデックスを更新"""
+    index = get_concept_index()
+    # 索引に入らないソースがあれば、辞書に書き込む前に止める
+    index.check_sources({source for _, concepts in entries for source, values in concepts.items() if values})
+    get_concept_store().save_many(entries)
+    for word, concepts in entries:
+        index.update(word, concepts)
 
 
-def export_dictionary():
-    """概念辞書をJSONファイルとしてエクスポート"""
-    if st.session_state.concept_dictionary:
-        return json.dumps(st.session_state.concept_dictionary, ensure_ascii=False, indent=2)
-    return "{}"
+def save_concepts_to_dictionary(word: str, concepts: Dict[str, List[str]]):
+    """検索した概念を辞書に保存"""
+    save_entries_to_dictionary([(word, concepts)])
+
+
+EXPORT_FORMATS = {
+    "jsonl": ("concept_dictionary.jsonl", "application/jsonl"),
+    "json": ("concept_dictionary.json", "application/json"),
+}
+
+
+IMPORT_SOURCE = "インポート"
+IMPORT_BATCH_SIZE = 2000
+# JSONの数値・true/false/nullの後に来る区切りの文字
+JSON_SCALAR_END_PATTERN = re.compile(r'[\s,\]}]')
+
+
+def _iter_json_object_items(text: io.TextIOBase, chunk_size: int = 1 << 16) -> Iterator[Tuple[str, object]]:
+    """巨大なJSONオブジェクトを先頭から少しずつ読み、キーと値の組を1つずつ返す"""
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+
+    def read_more() -> bool:
+        nonlocal buffer, pos
+        chunk = text.read(chunk_size)
+        buffer, pos = buffer[pos:] + chunk, 0
+        return bool(chunk)
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                raise ValueError("JSONが途中で終わっています")
+
+    def decode():
+        nonlocal pos
+        if buffer[pos] not in '"[{':
+            # 数値などは途中で切れていても（「1」「-1.」）読めてしまうため、区切りの文字まで読んでから解析する
+            while not JSON_SCALAR_END_PATTERN.search(buffer, pos) and read_more():
+                pass
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                return value
+            except json.JSONDecodeError:
+                # 値がバッファの末尾で切れている場合は続きを読んでやり直す
+                if not read_more():
+                    raise
+
+    if next_char() != "{":
+        raise ValueError("辞書のJSONはオブジェクトである必要があります")
+    pos += 1
+    if next_char() == "}":
+        return
+    while True:
+        next_char()
+        key = decode()
+        if next_char() != ":":
+            raise ValueError("JSONのキーの後に':'がありません")
+        pos += 1
+        next_char()
+        yield key, decode()
+        separator = next_char()
+        pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError("JSONの要素の区切りが不正です")
+
+
+def _import_concepts(value, source: str) -> Optional[Dict[str, List[str]]]:
+    """インポートした値をソースごとの概念に揃える（不正な値はNone）"""
+    if isinstance(value, list):
+        value = {source: value}
+    if not isinstance(value, dict):
+        return None
+    concepts = {}
+    for name, values in value.items():
+        if not isinstance(name, str) or not isinstance(values, list):
+            return None
+        concepts[name] = [concept for concept in values if isinstance(concept, str) and concept]
+    return concepts
+
+
+def iter_dictionary_import(stream: io.IOBase, fmt: Optional[str] = None, name: str = "",
+                           source: str = IMPORT_SOURCE) -> Iterator[Optional[Tuple[str, Dict[str, List[str]]]]]:
+    """エクスポートした辞書（JSON/JSONL、gzip可）を逐次読み、単語とソースごとの概念を返す
+
+    fmtを省略するとファイル名から判定する。ソースを持たない概念はsourceに入れ、不正な要素はNoneを返す。
+    """
+    stream = io.BufferedReader(stream) if not hasattr(stream, "peek") else stream
+    if stream.peek(2)[:2] == b"\x1f\x8b":
+        stream = gzip.GzipFile(fileobj=stream)
+        name = name[:-3] if name.endswith(".gz") else name
+    if fmt is None:
+        fmt = "jsonl" if name.endswith(".jsonl") else "json"
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+
+    if fmt == "jsonl":
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            word = record.get("word") if isinstance(record, dict) else None
+            concepts = _import_concepts(record.get("sources") or record.get("concepts"), source) if word else None
+            yield (word, concepts) if isinstance(word, str) and concepts is not None else None
+    else:
+        for word, value in _iter_json_object_items(text):
+            concepts = _import_concepts(value, source)
+            yield (word, concepts) if word and concepts is not None else None
+
+
+def import_dictionary(stream: io.IOBase, store: ConceptStore, index: Optional[ConceptIndex] = None,
+                      fmt: Optional[str] = None, name: str = "", source: str = IMPORT_SOURCE,
+                      batch_size: int = IMPORT_BATCH_SIZE, progress=None) -> Dict[str, float]:
+    """辞書ファイルを逐次読み、既存の概念と重複なく統合してバッチごとに保存する
+
+    progressを渡すと、書き込みのたびに処理済みの単語数を渡して呼び出す。
+    """
+    start = time.perf_counter()
+    entries = skipped = links = 0
+    batch = []
+
+    def flush():
+        nonlocal links
+        if index is not None:
+            # 索引に入らないソースがあれば、辞書に書き込む前に止める（辞書と索引の内容をずらさない）
+            index.check_sources({source for _, concepts in batch for source, values in concepts.items() if values})
+        links += store.save_many(batch, merge=True)
+        if index is not None:
+            for word, concepts in batch:
+                index.update(word, concepts, merge=True)
+        batch.clear()
+        if progress is not None:
+            progress(entries)
+
+    for entry in iter_dictionary_import(stream, fmt, name, source):
+        if entry is None:
+            skipped += 1
+            continue
+        entries += 1
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - start
+    return {"entries": entries, "skipped": skipped, "new_links": links, "seconds": elapsed,
+            "entries_per_second": entries / elapsed if elapsed else 0.0}
+
+
+def iter_dictionary_export(store: ConceptStore, fmt: str = "jsonl", since: Optional[float] = None,
+                           compress: bool = False) -> Iterator[bytes]:
+    """概念辞書を少しずつJSONLまたは1つのJSONオブジェクトとして書き出す"""
+    # gzipは圧縮器を通して逐次書き出す（wbits=31でgzip形式）
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "json":
+        yield emit("{")
+    first = True
+    for word, updated_at, concepts in store.iter_entries(since):
+        if fmt == "jsonl":
+            record = {"word": word, "concepts": merge_source_concepts(concepts),
+                      "sources": concepts, "updated_at": updated_at}
+            yield emit(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        else:
+            # JSONは従来の{単語: 統合した概念}の形式（区切りの空白は省く）
+            chunk = json.dumps(word, ensure_ascii=False) + ":" + json.dumps(
+                merge_source_concepts(concepts), ensure_ascii=False, separators=(",", ":"))
+            yield emit(chunk if first else "," + chunk)
+        first = False
+    if fmt == "json":
+        yield emit("}")
+    if compressor:
+        yield compressor.flush()
+
+
+def export_dictionary(fmt: str = "jsonl", since: Optional[float] = None, compress: bool = False) -> io.RawIOBase:
+    """概念辞書を一時ファイルに書き出し、先頭に戻したファイルを返す（st.download_buttonにそのまま渡せる）"""
+    output = tempfile.TemporaryFile(buffering=0)
+    for chunk in iter_dictionary_export(get_concept_store(), fmt, since, compress):
+        if chunk:
+            output.write(chunk)
+    output.seek(0)
+    return output
+
+
+def search_and_store(word: str, sources: List[str], engine: str, deadline_seconds: float,
+                     extractor: str) -> Dict[str, List[str]]:
+    """共有キャッシュ経由で検索し、見つかった概念を辞書と履歴に保存"""
+    with st.spinner(f"「{word}」の関連概念を検索中..."), shared_scraper() as scraper:
+        # 並列検索実行（選択されたソースのみ、共有キャッシュ経由、制限時間付き）
+        deadline = Deadline(deadline_seconds)
+        concepts = search_concepts_cached(scraper, word, sources, SEARCH_ENGINES[engine], deadline, extractor)
+
+        # 制限時間内に揃わなかったソースを表示
+        incomplete = {source: status for source, status in deadline.statuses.items()
+                      if status != "complete"}
+        if incomplete:
+            st.caption("⏱️ " + ", ".join(
+                f"{source}: {SOURCE_STATUS_LABELS[status]}" for source, status in incomplete.items()
+            ))
+
+        # 辞書には完了したソースだけを保存（時間切れ・一部のみ・エラーのソースは次に表示するときに検索し直す）
+        complete = {source: values for source, values in concepts.items()
+                    if deadline.statuses.get(source) == "complete"}
+        if any(complete.values()):
+            save_concepts_to_dictionary(word, complete)
+        # 完了して何も見つからなかったソースも記録し、表示のたびに検索し直さないようにする
+        get_concept_store().mark_empty(word, [source for source, status in deadline.statuses.items()
+                                              if status == "complete" and not concepts.get(source)])
+
+        if any(concepts.values()):
+            # 履歴に追加
+            if word not in st.session_state.search_history:
+                st.session_state.search_history.append(word)
+    return concepts
+
+
+def show_word(word: str, sources: List[str], engine: str, deadline_seconds: float, extractor: str):
+    """辞書に登録済みのソースはその概念を使い、未登録（検索して空だったものを除く）のソースだけを検索して表示対象にする"""
+    store = get_concept_store()
+    concepts = store.get(word) or {}
+    empty = store.empty_sources(word)
+    missing = [source for source in sources if source not in concepts and source not in empty]
+    if missing:
+        concepts.update(search_and_store(word, missing, engine, deadline_seconds, extractor))
+    st.session_state.current_word = word
+    st.session_state.concepts = concepts
 
 
 def main():
@@ -302,43 +3356,142 @@ def main():
 
         search_sources = st.multiselect(
             "検索ソース",
-            ["Wikipedia", "Weblio", "コトバンク", "関連検索"],
-            default=["Wikipedia", "Weblio", "コトバンク", "関連検索"]
+            SEARCH_SOURCES,
+            default=SEARCH_SOURCES
         )
 
         max_concepts_per_source = st.slider("ソースあたりの最大概念数", 3, 15, 8)
 
+        search_engine = st.radio("検索エンジン", list(SEARCH_ENGINES), horizontal=True)
+
+        extraction_backend = st.radio("概念抽出", list(EXTRACTION_BACKENDS), horizontal=True,
+                                      help="janome: 形態素解析で名詞のみを抽出（要Janome）")
+
+        search_deadline = st.slider("検索の制限時間（秒）", 1.0, 10.0, SEARCH_DEADLINE, 0.5)
+
         st.header("📚 構築済み辞書")
-        if st.session_state.concept_dictionary:
-            st.write(f"登録済み単語: {len(st.session_state.concept_dictionary)}")
+        store = get_concept_store()
+        word_count = store.count()
+        if word_count:
+            st.write(f"登録済み単語: {word_count}")
 
-            # 辞書の内容を表示
+            # 辞書の内容を表示（最近更新した単語）
             with st.expander("辞書の内容"):
-                for word, concepts in list(st.session_state.concept_dictionary.items())[:5]:
+                for word, concepts in store.recent(5):
                     st.write(f"**{word}**: {', '.join(concepts[:5])}...")
 
+            # 逆引き（概念からその概念を持つ単語を探す）
+            with st.expander("🔁 逆引き"):
+                index = get_concept_index()
+                reverse_query = st.text_input("概念", key="reverse_query")
+                if reverse_query:
+                    hits = index.lookup(reverse_query.strip())
+                    if hits:
+                        for hit in hits[:20]:
+                            if st.button(f"{hit.word}（{', '.join(hit.sources)}）", key=f"reverse_{hit.word}"):
+                                show_word(hit.word, search_sources, search_engine, search_deadline, extraction_backend)
+                                st.rerun()
+                    else:
+                        st.caption("この概念を持つ単語はありません")
+                if st.session_state.current_word:
+                    neighbours = index.neighbours(st.session_state.current_word, 5)
+                    if neighbours:
+                        st.markdown(f"**「{st.session_state.current_word}」と概念を共有する単語**")
+                        for other, shared in neighbours:
+                            st.write(f"{other}（共通 {shared}）")
+                st.caption("語数: {words} / 概念数: {concepts} / 対応数: {links}".format(**index.stats()))
+
             # エクスポート機能
+            export_format = st.radio("形式", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+            export_gzip = st.checkbox("gzipで圧縮", key="export_gzip")
+            last_export_at = st.session_state.get("last_export_at")
+            export_since = None
+            if last_export_at and st.checkbox(
+                    f"前回のエクスポート（{time.strftime('%H:%M:%S', time.localtime(last_export_at))}）以降の更新のみ",
+                    key="export_incremental"):
+                export_since = last_export_at
             if st.button("📥 辞書をダウンロード"):
-                dictionary_json = export_dictionary()
+                exported_at = time.time()
+                file_name, mime = EXPORT_FORMATS[export_format]
+                if export_gzip:
+                    file_name, mime = file_name + ".gz", "application/gzip"
                 st.download_button(
-                    label="💾 JSONファイルをダウンロード",
-                    data=dictionary_json,
-                    file_name="concept_dictionary.json",
-                    mime="application/json"
+                    label=f"💾 {file_name} をダウンロード",
+                    data=export_dictionary(export_format, export_since, export_gzip),
+                    file_name=file_name,
+                    mime=mime
                 )
+                st.session_state.last_export_at = exported_at
         else:
             st.info("まだ概念が登録されていません")
 
+        # インポート機能（エクスポートした辞書を既存の辞書に統合する）
+        with st.expander("📤 辞書を読み込む"):
+            uploaded = st.file_uploader("辞書ファイル", type=["json", "jsonl", "gz"], key="import_file")
+            import_source = st.text_input("ソース名（ソースを持たない概念の記録先）", IMPORT_SOURCE, key="import_source")
+            if uploaded is not None and st.button("読み込む"):
+                status = st.empty()
+                try:
+                    result = import_dictionary(
+                        uploaded, store, get_concept_index(), name=uploaded.name,
+                        source=import_source.strip() or IMPORT_SOURCE,
+                        progress=lambda entries: status.caption(f"{entries}語を統合...")
+                    )
+                except (ValueError, OSError, EOFError, zlib.error) as e:
+                    # 壊れた・途中で切れたgzipやJSON、ソース数の上限超えなど
+                    status.error(f"読み込みに失敗しました: {e}")
+                else:
+                    status.success(
+                        f"{result['entries']}語を{result['seconds']:.1f}秒で統合 "
+                        f"({result['entries_per_second']:.0f} 語/秒, 新しい対応 {result['new_links']}件"
+                        + (f", 不正な要素 {result['skipped']}件" if result['skipped'] else "") + ")"
+                    )
+
+        # 接続統計
+        with st.expander("🔌 接続統計"):
+            pool_stats = get_shared_scraper().pool_stats.snapshot()
+            st.write(f"リクエスト数: {pool_stats['checkouts']}")
+            st.write(f"プールヒット: {pool_stats['pool_hits']}")
+            st.write(f"TCP/TLSハンドシェイク: {pool_stats['handshakes']}")
+            st.write(f"接続再利用: {pool_stats['reused_connections']} ({pool_stats['reuse_rate']:.0%})")
+            st.write(f"集約された同時検索: {get_shared_scraper().flight.coalesced}")
+            for host, limit in get_shared_scraper().rate_limiter.snapshot().items():
+                st.caption(f"{host}: {limit['rate']:.1f} req/s, 実行中 {limit['in_flight']}, 制限応答 {limit['throttled']}")
+            parse_pool = get_shared_scraper().parse_pool
+            if parse_pool is not None:
+                st.write(f"解析プロセス: {parse_pool.workers}, 解析依頼: {parse_pool.submitted}")
+            hedging = get_shared_scraper().hedging
+            if hedging is not None:
+                hedge_stats = hedging.snapshot()
+                st.write(f"ヘッジ送信: {hedge_stats['hedges']} ({hedge_stats['hedge_ratio']:.1%}), "
+                         f"ヘッジ採用: {hedge_stats['hedge_wins']}")
+            for source, breaker in get_shared_scraper().breakers.items():
+                if breaker.state != "closed":
+                    st.caption(f"⛔ {source}: {breaker.state}（連続エラー {breaker.failures}回）")
+            if st.button("🔌 接続をリセット"):
+                close_shared_scraper()
+                st.rerun()
+
+        # 共有検索キャッシュ
+        with st.expander("🧠 検索キャッシュ"):
+            cache_stats = get_search_result_cache().stats()
+            st.write(f"保持件数: {cache_stats['entries']}")
+            st.write(f"ヒット/ミス: {cache_stats['hits']} / {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+            extraction_stats = get_shared_scraper().extraction_cache.stats()
+            st.write(f"抽出結果: {extraction_stats['entries']}件 ({extraction_stats['bytes'] / 1024:.0f} KB), "
+                     f"ヒット率 {extraction_stats['hit_rate']:.0%}")
+            if st.button("🧹 キャッシュを消去"):
+                get_search_result_cache().purge()
+                get_shared_scraper().extraction_cache.purge()
+                st.rerun()
+
         # 検索履歴
         st.header("📜 検索履歴")
         if st.session_state.search_history:
             for i, word in enumerate(reversed(st.session_state.search_history[-5:])):
                 if st.button(f"🔄 {word}", key=f"history_{i}"):
-                    st.session_state.current_word = word
-                    if word in st.session_state.concept_dictionary:
-                        # 既存の概念を表示
-                        concepts = st.session_state.concept_dictionary[word]
-                        st.session_state.concepts = {"保存済み": concepts}
+                    # 辞書に登録済みの概念を優先して表示
+                    show_word(word, search_sources, search_engine, search_deadline, extraction_backend)
                     st.rerun()
 
     # メインエリア
@@ -357,31 +3510,15 @@ def main():
         if st.button("🔍 概念を検索", type="primary"):
             if search_word and search_word.strip():
                 word = search_word.strip()
+                filtered_concepts = search_and_store(word, search_sources, search_engine, search_deadline,
+                                                     extraction_backend)
 
-                # 検索中の表示
-                with st.spinner(f"「{word}」の関連概念を検索中..."):
-                    scraper = WebConceptScraper()
-
-                    # 並列検索実行
-                    concepts = search_concepts_parallel(scraper, word)
-
-                    # 選択されたソースのみフィルタ
-                    filtered_concepts = {k: v for k, v in concepts.items() if k in search_sources}
-
-                    if any(filtered_concepts.values()):
-                        st.session_state.current_word = word
-                        st.session_state.concepts = filtered_concepts
-
-                        # 辞書に保存
-                        save_concepts_to_dictionary(word, filtered_concepts)
-
-                        # 履歴に追加
-                        if word not in st.session_state.search_history:
-                            st.session_state.search_history.append(word)
-
-                        st.success(f"「{word}」の概念を検索しました！")
-                    else:
-                        st.warning("関連概念が見つかりませんでした。")
+                if any(filtered_concepts.values()):
+                    st.session_state.current_word = word
+                    st.session_state.concepts = filtered_concepts
+                    st.success(f"「{word}」の概念を検索しました！")
+                else:
+                    st.warning("関連概念が見つかりませんでした。")
             else:
                 st.error("検索する単語を入力してください。")
 
@@ -394,16 +3531,28 @@ def main():
                     st.write(f"**{source}** ({len(concept_list)}個):")
                     for i, concept in enumerate(concept_list, 1):
                         if st.button(f"{i}. {concept}", key=f"concept_{source}_{i}"):
-                            # クリックした概念で新しい検索
-                            st.session_state.current_word = concept
-                            # 既存の概念があるかチェック
-                            if concept in st.session_state.concept_dictionary:
-                                existing_concepts = st.session_state.concept_dictionary[concept]
-                                st.session_state.concepts = {"保存済み": existing_concepts}
-                            else:
-                                st.session_state.concepts = {}
+                            # クリックした概念を表示（辞書に無ければ新しく検索）
+                            show_word(concept, search_sources, search_engine, search_deadline, extraction_backend)
                             st.rerun()
 
+            # 表示中の概念のWikipediaページをまとめて取得し、辞書に登録しておく
+            if st.button("📚 Wikipediaで一括展開", help="表示中の概念をまとめて問い合わせ、辞書に登録します"):
+                words = [concept for concept_list in st.session_state.concepts.values() for concept in concept_list]
+                stored = get_concept_store().contains_many(words)
+                words = [word for word in words if word not in stored]
+                with st.spinner(f"{len(words)}個の概念を展開中..."), shared_scraper() as scraper:
+                    try:
+                        expanded = scraper.search_wikipedia_batch(
+                            words, deadline=Deadline(search_deadline),
+                            extractor=scraper.extractors[extraction_backend]
+                        )
+                    except Exception as e:
+                        st.warning(f"Wikipedia一括展開エラー: {str(e)}")
+                        expanded = {}
+                expanded = {concept: related for concept, related in expanded.items() if related}
+                save_entries_to_dictionary([(concept, {"Wikipedia": related}) for concept, related in expanded.items()])
+                st.success(f"{len(expanded)}個の概念を展開して辞書に登録しました")
+
         # クリア機能
         if st.button("🗑️ 結果をクリア"):
             st.session_state.current_word = None